@@ -5,7 +5,9 @@ Filtrage strict : on ne garde que ce qui compte vraiment.
 import re
 from typing import List, Dict, Tuple, Set
 from dataclasses import dataclass
-from datetime import datetime
+import time
+
+from sources import timestamps
 
 
 @dataclass
@@ -93,17 +95,13 @@ class NewsAnalyzer:
 
         # ── Boost récence ──
         recency_boost = 0
-        try:
-            published = item.get('published')
-            if published:
-                pub_date = datetime.fromisoformat(published.replace('Z', '+00:00'))
-                hours_ago = (datetime.now() - pub_date.replace(tzinfo=None)).total_seconds() / 3600
-                if hours_ago < 6:
-                    recency_boost = 2
-                elif hours_ago < 12:
-                    recency_boost = 1
-        except Exception:
-            pass
+        published_ts = timestamps.item_ts(item)
+        if published_ts is not None:
+            hours_ago = (time.time() - published_ts) / 3600
+            if hours_ago < 6:
+                recency_boost = 2
+            elif hours_ago < 12:
+                recency_boost = 1
 
         # ── Engagement ──
         engagement = min(item.get('score', 0) // 100, 5)
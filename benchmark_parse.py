@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+AliDonerBot — Benchmark du parsing : processus principal vs pool de processus
+Mesure la partie CPU d'une collecte (feeds RSS + pages GitHub Trending) sur
+les mêmes payloads, sans réseau, pour choisir PARSE_WORKERS (config.py).
+
+Usage :
+    python benchmark_parse.py                   # payloads synthétiques
+    python benchmark_parse.py --feeds dossier/  # feeds réels sauvegardés (*.xml)
+    python benchmark_parse.py --workers 2 4 --feeds-count 60
+"""
+import argparse
+import glob
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from email.utils import formatdate
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from sources import parse_pool
+from sources.github_trending import parse_page
+from sources.rss_fetcher import extract_entries
+
+HEADERS = {'content-type': 'application/rss+xml; charset=utf-8', 'content-location': 'https://example.com/feed'}
+
+
+def synthetic_feed(index: int, items: int) -> bytes:
+    """Feed RSS 2.0 type blog : articles complets en HTML dans content:encoded"""
+    now = time.time()
+    paragraph = "<p>Large language models <a href='/post'>keep</a> improving on <b>reasoning</b> benchmarks.</p>"
+    body = "".join(
+        f"<item><title>Post {index}-{i}</title><link>https://example.com/{index}/{i}</link>"
+        f"<guid>https://example.com/{index}/{i}</guid><pubDate>{formatdate(now - i * 3600)}</pubDate>"
+        f"<description><![CDATA[{paragraph * 3}]]></description>"
+        f"<content:encoded><![CDATA[{paragraph * 80}]]></content:encoded></item>"
+        for i in range(items)
+    )
+    return (
+        '<?xml version="1.0" encoding="utf-8"?><rss version="2.0" '
+        'xmlns:content="http://purl.org/rss/1.0/modules/content/"><channel><title>Blog</title>'
+        f"{body}</channel></rss>"
+    ).encode()
+
+
+def synthetic_trending(repos: int = 25) -> str:
+    """Page GitHub Trending réduite au markup lu par le parser (+ bruit autour)"""
+    article = (
+        '<article class="Box-row"><h2><a href="/org/repo{i}">org / repo{i}</a></h2>'
+        '<p class="col-9">An agent framework for LLM apps</p>'
+        '<span itemprop="programmingLanguage">Python</span>'
+        '<a class="Link--muted" href="/org/repo{i}/stargazers">1,234</a>'
+        '<span class="float-sm-right">56 stars today</span></article>'
+    )
+    noise = '<div class="header">' + '<span>menu</span>' * 2000 + '</div>'
+    return f"<html><body>{noise}" + "".join(article.format(i=i) for i in range(repos)) + f"{noise}</body></html>"
+
+
+def load_payloads(args):
+    if args.feeds:
+        feeds = []
+        for path in sorted(glob.glob(os.path.join(args.feeds, "*.xml"))):
+            with open(path, "rb") as f:
+                feeds.append(f.read())
+    else:
+        feeds = [synthetic_feed(i, args.items) for i in range(args.feeds_count)]
+    pages = [synthetic_trending() for _ in range(args.pages)]
+    return feeds, pages
+
+
+def run_in_process(feeds, pages, cutoff_ts):
+    for content in feeds:
+        extract_entries(content, HEADERS, cutoff_ts)
+    for html in pages:
+        parse_page(html, "llm", "daily")
+
+
+def run_in_pool(pool: ProcessPoolExecutor, feeds, pages, cutoff_ts):
+    futures = [pool.submit(extract_entries, content, HEADERS, cutoff_ts) for content in feeds]
+    futures += [pool.submit(parse_page, html, "llm", "daily") for html in pages]
+    for future in futures:
+        future.result()
+
+
+def best_of(repeat: int, fn, *args) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(*args)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark parsing : in-process vs pool de processus")
+    parser.add_argument("--feeds", type=str, default=None, help="Dossier de feeds sauvegardés (*.xml)")
+    parser.add_argument("--feeds-count", type=int, default=30, help="Feeds synthétiques (défaut: 30)")
+    parser.add_argument("--items", type=int, default=20, help="Items par feed synthétique (défaut: 20)")
+    parser.add_argument("--pages", type=int, default=5, help="Pages GitHub Trending (défaut: 5)")
+    parser.add_argument("--workers", type=int, nargs="+", default=[2, 4], help="Tailles de pool testées")
+    parser.add_argument("--repeat", type=int, default=3, help="Répétitions (meilleur temps gardé)")
+    args = parser.parse_args()
+
+    feeds, pages = load_payloads(args)
+    cutoff_ts = time.time() - 7 * 86400  # Fenêtre large : tout le feed est parsé
+    size = sum(len(f) for f in feeds) / 1024
+    print(f"📦 {len(feeds)} feeds ({size:.0f} Ko) + {len(pages)} pages GitHub — {os.cpu_count()} CPU")
+
+    baseline = best_of(args.repeat, run_in_process, feeds, pages, cutoff_ts)
+    print(f"   in-process          : {baseline * 1000:7.0f} ms")
+
+    for workers in args.workers:
+        parse_pool.configure(workers)
+        start = time.perf_counter()
+        pool = parse_pool._get_pool()
+        pool.submit(time.time).result()  # Démarrage effectif d'un worker
+        startup = time.perf_counter() - start
+        warm = best_of(args.repeat, run_in_pool, pool, feeds, pages, cutoff_ts)
+        print(
+            f"   pool {workers} workers      : {warm * 1000:7.0f} ms "
+            f"(x{baseline / warm:.2f}, + {startup * 1000:.0f} ms de démarrage)"
+        )
+    parse_pool.shutdown()
+
+
+if __name__ == "__main__":
+    main()
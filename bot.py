@@ -7,6 +7,8 @@ Chaque matin, ultra court, actionnable, pédagogique, zéro bruit.
 
 import sys
 import os
+import math
+import time
 from datetime import datetime, timedelta
 from typing import List, Dict, Optional
 
@@ -14,11 +16,10 @@ from typing import List, Dict, Optional
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
 import config
-from sources.rss_fetcher import RSSFetcher
-from sources.hackernews import HackerNewsFetcher
-from sources.reddit import RedditFetcher
-from sources.github_trending import GitHubTrendingFetcher
-from sources.twitter_fetcher import TwitterFetcher
+import http_client
+from sources import parse_pool, scheduler, timestamps
+from sources.http_cache import http_cache
+from sources.registry import Window
 from analyzer import NewsAnalyzer, AnalyzedItem
 from telegram_formatter import TelegramFormatter
 from telegram_sender import TelegramSender, get_sender_from_env
@@ -26,18 +27,18 @@ from subscribers import get_all_subscribers, add_subscriber
 from history import filter_already_sent, mark_as_sent
 from ollama_summarizer import OllamaSummarizer
 
+# Types de source collectés (config.Source.type), dans l'ordre de fusion : sortie reproductible
+COLLECTED_SOURCES = ["rss", "hackernews", "reddit", "github", "twitter"]
+
 
 class AliDonerBot:
     """
     Bot de veille IA — collecte multi-sources, priorise, enrichit par IA, formate, envoie.
     """
 
-    def __init__(self):
-        self.rss_fetcher = RSSFetcher()
-        self.hn_fetcher = HackerNewsFetcher()
-        self.reddit_fetcher = RedditFetcher()
-        self.github_fetcher = GitHubTrendingFetcher()
-        self.twitter_fetcher = TwitterFetcher()
+    def __init__(self, adaptive_polling: bool = None):
+        # Feeds RSS pas encore dus servis par le cache (défaut: config)
+        self.adaptive_polling = config.ADAPTIVE_POLLING if adaptive_polling is None else adaptive_polling
         self.analyzer = NewsAnalyzer(config)
         self.summarizer = OllamaSummarizer()
         self.formatter = TelegramFormatter(
@@ -54,6 +55,7 @@ class AliDonerBot:
         send_telegram: bool = False,
         since_last_run: bool = False,
         weekly_mode: bool = False,
+        parallel: bool = None,
     ) -> str:
         """
         Pipeline complet : collect → analyze → enrich (IA) → format → save → send
@@ -63,19 +65,24 @@ class AliDonerBot:
             output_file: Fichier de sortie (optionnel)
             send_telegram: Envoyer sur Telegram
             since_last_run: Utiliser le timestamp du dernier run
+            parallel: Collecter les sources en parallèle (défaut: config)
 
         Returns:
             Message Telegram formaté
         """
         # Déterminer la fenêtre temporelle
+        run_started = datetime.now()
+        since_ts = None
         if since_last_run:
             last_run = config.get_last_run()
             if last_run:
-                hours_diff = (datetime.now() - last_run).total_seconds() / 3600
-                days_back = max(1, int(hours_diff / 24) + 1)
+                # Fenêtre exacte, poussée jusqu'aux fetchers (plus d'arrondi au jour)
+                since_ts = last_run.timestamp() - config.SINCE_LAST_RUN_OVERLAP_MINUTES * 60
+                hours_diff = (run_started.timestamp() - since_ts) / 3600
+                days_back = max(1, math.ceil(hours_diff / 24))
                 window_str = f"depuis {last_run.strftime('%d/%m %Hh%M')}"
                 print(f"⏰ Dernier run: {last_run.strftime('%Y-%m-%d %H:%M')}")
-                print(f"   → Fenêtre: {hours_diff:.0f}h ({days_back} jour(s))")
+                print(f"   → Fenêtre: {hours_diff:.1f}h")
             else:
                 days_back = days_back or config.DAYS_BACK
                 window_str = f"dernières {days_back * 24}h"
@@ -86,8 +93,11 @@ class AliDonerBot:
 
         if weekly_mode:
             days_back = 7
+            since_ts = None
             window_str = "résumé de la semaine"
 
+        since_ts = timestamps.window_start(days_back, since_ts)
+
         print()
         print("=" * 60)
         mode_label = "HEBDO" if weekly_mode else ""
@@ -101,39 +111,14 @@ class AliDonerBot:
         print("📥 PHASE 1 : COLLECTION DES SOURCES")
         print("-" * 40)
 
-        all_items = []
-
-        # RSS feeds
-        print("\n1. RSS Feeds...")
-        for source in config.RSS_SOURCES:
-            items = self.rss_fetcher.fetch_feed(source.name, source.url, days_back)
-            for item in items:
-                item['source_category'] = source.category
-                item['priority_boost'] = source.priority_boost
-            all_items.extend(items)
-
-        # Hacker News
-        print("\n2. Hacker News...")
-        hn_items = self.hn_fetcher.fetch_all(config.HACKERNEWS_QUERIES, days_back)
-        all_items.extend(hn_items)
-
-        # Reddit
-        print("\n3. Reddit...")
-        reddit_items = self.reddit_fetcher.fetch_all(config.REDDIT_SOURCES)
-        all_items.extend(reddit_items)
-
-        # GitHub Trending
-        print("\n4. GitHub Trending...")
-        gh_items = self.github_fetcher.fetch_all(config.GITHUB_TOPICS)
-        all_items.extend(gh_items)
-
-        # X / Twitter
-        print("\n5. X / Twitter...")
-        twitter_items = self.twitter_fetcher.fetch_all(days_back)
-        all_items.extend(twitter_items)
+        if parallel is None:
+            parallel = config.PARALLEL_COLLECTION
+        all_items = self._collect(days_back, since_ts, parallel)
 
         print()
         print(f"📊 Total collecté : {len(all_items)} items")
+        print(http_cache.report())
+        print(http_client.breaker_report())
 
         # Filtrer les news déjà envoyées les jours précédents
         all_items = filter_already_sent(all_items)
@@ -272,8 +257,11 @@ class AliDonerBot:
                 print("   💡 Lance: python setup_telegram.py")
             print()
 
+        print(http_client.report())
+        print()
+
         # Sauvegarder le timestamp du run
-        config.save_last_run()
+        config.save_last_run(run_started)
 
         # Afficher le message
         print("=" * 60)
@@ -286,6 +274,18 @@ class AliDonerBot:
 
         return telegram_message
 
+    # ──────────────────────────────────────
+    # Collecte
+    # ──────────────────────────────────────
+
+    def _collect(self, days_back: int, since_ts: float, parallel: bool) -> List[Dict]:
+        """Les 5 familles de sources (voir sources/registry.py), fusionnées dans cet ordre"""
+        return scheduler.collect(
+            COLLECTED_SOURCES, Window(days_back, since_ts),
+            params={"rss": {"adaptive": self.adaptive_polling}},
+            parallel=parallel,
+        )
+
     def _save_output(self, message: str, filepath: str):
         """Sauvegarde le message dans un fichier"""
         directory = os.path.dirname(filepath) if os.path.dirname(filepath) else "output"
@@ -337,9 +337,28 @@ def main():
         "--weekly", action="store_true",
         help="Envoyer le résumé hebdo (7 derniers jours, top 5)"
     )
+    parser.add_argument(
+        "--sequential", action="store_true",
+        help="Collecter les sources une par une (pas de parallélisme)"
+    )
+    parser.add_argument(
+        "--adaptive-polling", action="store_true",
+        help="Ne fetcher que les feeds RSS dus d'après leur rythme de publication"
+    )
+    parser.add_argument(
+        "--all-feeds", action="store_true",
+        help="Fetcher tous les feeds RSS, même ceux pas encore dus"
+    )
+    parser.add_argument(
+        "--parse-workers", type=int, default=None,
+        help="Processus dédiés au parsing des feeds (défaut: config, 0 = aucun)"
+    )
 
     args = parser.parse_args()
 
+    if args.parse_workers is not None:
+        parse_pool.configure(args.parse_workers)
+
     # Mode setup
     if args.setup:
         os.system(f'{sys.executable} "{os.path.join(os.path.dirname(__file__), "setup_telegram.py")}"')
@@ -352,13 +371,14 @@ def main():
 
     # Mode hebdo (dimanche)
     if args.weekly:
-        bot = AliDonerBot()
+        bot = AliDonerBot(adaptive_polling=_adaptive_polling(args))
         try:
             message = bot.run(
                 days_back=7,
                 output_file=args.output,
                 send_telegram=args.send,
                 weekly_mode=True,
+                parallel=False if args.sequential else None,
             )
         except Exception as e:
             print(f"\n\n❌ Erreur: {e}")
@@ -368,7 +388,7 @@ def main():
         return
 
     # Mode normal
-    bot = AliDonerBot()
+    bot = AliDonerBot(adaptive_polling=_adaptive_polling(args))
 
     try:
         message = bot.run(
@@ -376,6 +396,7 @@ def main():
             output_file=args.output,
             send_telegram=args.send,
             since_last_run=args.since_last_run,
+            parallel=False if args.sequential else None,
         )
 
     except KeyboardInterrupt:
@@ -388,6 +409,13 @@ def main():
         sys.exit(1)
 
 
+def _adaptive_polling(args) -> Optional[bool]:
+    """--all-feeds / --adaptive-polling, sinon config.ADAPTIVE_POLLING"""
+    if args.all_feeds:
+        return False
+    return True if args.adaptive_polling else None
+
+
 def _run_scheduled(args):
     """Mode planifié — exécute le bot à une heure fixe chaque jour"""
     try:
@@ -406,7 +434,7 @@ def _run_scheduled(args):
 
     def job():
         print(f"\n⏰ Exécution planifiée — {datetime.now().strftime('%Y-%m-%d %H:%M')}")
-        bot = AliDonerBot()
+        bot = AliDonerBot(adaptive_polling=_adaptive_polling(args))
         bot.run(
             send_telegram=True,
             since_last_run=True,
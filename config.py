@@ -37,10 +37,10 @@ def get_last_run() -> Optional[datetime]:
     return None
 
 
-def save_last_run():
-    """Sauvegarde le timestamp du run actuel"""
+def save_last_run(when: Optional[datetime] = None):
+    """Sauvegarde le timestamp du run actuel (son début si `when` est donné)"""
     with open(LAST_RUN_FILE, "w") as f:
-        f.write(datetime.now().isoformat())
+        f.write((when or datetime.now()).isoformat())
 
 
 # === SOURCES ===
@@ -120,6 +120,13 @@ HACKERNEWS_QUERIES = [
     "AI regulation",
 ]
 
+# Mode batch (une requête pour toutes les queries) : points minimum d'une story.
+# Le digest ignore les stories à 1-2 points ; les alertes (toutes les 4h)
+# doivent voir les toutes nouvelles. À points>=1, 24h de HN dépassent une page
+# Algolia : le fetcher le retient et passe directement en mode par query.
+HN_BATCH_MIN_POINTS = 3
+HN_ALERT_MIN_POINTS = 1
+
 # === GITHUB TOPICS ===
 # Réduit aux topics les plus pertinents
 GITHUB_TOPICS = [
@@ -186,3 +193,65 @@ MAX_RUMORS = 0         # Rumeurs désactivées
 MAX_ACTIONS = 0        # Actions désactivées (remplacé par "Idée à piquer")
 
 DAYS_BACK = 1  # Par défaut : dernières 24h (changé de 2 à 1)
+# --since-last-run : fenêtre exacte depuis le début du run précédent, avec une
+# marge pour les items publiés juste avant mais apparus en retard dans les flux
+SINCE_LAST_RUN_OVERLAP_MINUTES = 15
+
+# === HTTP ===
+# Client partagé (http_client.py) : pools keep-alive par hôte
+HTTP_POOL_CONNECTIONS = 50   # Hôtes gardés en pool (≈ 30 feeds RSS + APIs)
+HTTP_POOL_MAXSIZE = 10       # Connexions keep-alive max par hôte
+HTTP_TIMEOUT = 15            # Timeout par défaut (secondes)
+
+# Politesse par source (rate_limiter.py) : espacement mini entre 2 requêtes
+# vers un MÊME hôte, + token bucket optionnel (rate = req/s, burst).
+# Des hôtes différents ne s'attendent pas entre eux.
+RATE_LIMITS = {
+    "rss": {"min_interval": 0.2},
+    "hackernews": {"min_interval": 0.3},
+    "reddit": {"min_interval": 0.3, "rate": 0.5, "burst": 10},  # Reddit bloque vite
+    "github": {"min_interval": 0.5},
+    "twitter": {"min_interval": 0.15},  # Instances Nitter / RSSHub
+    "x_api": {"min_interval": 0.3},
+}
+
+# Fiabilité (reliability.py), appliquée aux requêtes des sources :
+# retry des erreurs transitoires (connexion, 429, 5xx) avec backoff + jitter.
+# Les timeouts ne sont pas retentés (ils ont déjà coûté leur délai complet).
+HTTP_RETRIES = 2
+HTTP_RETRIES_BY_SOURCE = {"x_api": 0}  # X : chaque retry brûle du quota
+HTTP_BACKOFF_BASE = 0.5   # 1er retry ≤ 0.5s, puis ≤ 1s, ≤ 2s...
+HTTP_BACKOFF_CAP = 8      # Attente max entre 2 essais (secondes)
+
+# Circuit breaker par hôte (état gardé entre les runs dans .cache/)
+BREAKER_THRESHOLD = 3            # Échecs consécutifs avant d'ouvrir le circuit
+BREAKER_COOLDOWN = 3600          # 1h avant la 1re requête de test
+BREAKER_MAX_COOLDOWN = 24 * 3600  # Cooldown doublé à chaque échec du test, plafonné
+
+# === COLLECTE ===
+# Les 5 familles de sources tournent en parallèle (désactiver avec --sequential)
+PARALLEL_COLLECTION = True
+
+# Moteur RSS async : connexions simultanées au total / par hôte
+RSS_MAX_CONCURRENCY = 10
+RSS_PER_HOST_CONCURRENCY = 2
+
+# Polling adaptatif (sources/poll_schedule.py) : un feed RSS n'est re-fetché que
+# s'il est "dû" d'après son rythme de publication. Les posts publiés entre-temps
+# arrivent au fetch suivant, donc en retard : désactivé pour le digest
+# (bot : --adaptive-polling pour l'activer), activé pour les alertes (labs, 2h max).
+ADAPTIVE_POLLING = False
+ADAPTIVE_POLLING_ALERTS = True
+
+# Parsing CPU (feeds RSS, pages GitHub) dans un pool de processus (sources/parse_pool.py).
+# 0 = dans le processus principal ; surcharge : --parse-workers N
+PARSE_WORKERS = 0
+
+# Deadline wall-clock par famille (secondes) : au-delà, ses résultats sont ignorés
+SOURCE_DEADLINES = {
+    "rss": 90,
+    "hackernews": 30,
+    "reddit": 45,
+    "github": 40,
+    "twitter": 60,
+}
@@ -0,0 +1,186 @@
+"""
+AliDonerBot — Client HTTP partagé
+Une seule requests.Session avec des pools keep-alive par hôte : fetchers,
+envoi Telegram et appels LLM réutilisent leurs connexions TCP/TLS au lieu
+de refaire un handshake à chaque requête (ex : 1 par abonné Telegram).
+Usage : http_client.get(...) / http_client.post(...), comme requests ;
+passer source="reddit" (etc.) pour la politesse, les retries et le breaker.
+Pendant une collecte (sources/scheduler.py), les requêtes sans `source=`
+prennent celle du type de source en cours.
+"""
+import time
+import threading
+from contextvars import ContextVar
+from typing import Dict, Optional
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+
+import config
+from rate_limiter import HostScheduler
+from reliability import CircuitOpenError, RETRY_STATUSES, backoff_delay, get_breaker
+
+try:
+    import brotli  # noqa: F401 — urllib3 décode br si dispo
+    ACCEPT_ENCODING = "gzip, deflate, br"
+except ImportError:
+    ACCEPT_ENCODING = "gzip, deflate"
+
+# Type de source en cours de collecte (posé par le scheduler pour chaque fetch)
+current_source: ContextVar[Optional[str]] = ContextVar("current_source", default=None)
+
+
+class HTTPClient:
+    def __init__(
+        self,
+        pool_connections: int = config.HTTP_POOL_CONNECTIONS,
+        pool_maxsize: int = config.HTTP_POOL_MAXSIZE,
+        timeout: float = config.HTTP_TIMEOUT,
+    ):
+        """
+        Args:
+            pool_connections: Nombre d'hôtes dont le pool est gardé ouvert
+            pool_maxsize: Connexions keep-alive max par hôte
+            timeout: Timeout par défaut (si l'appelant n'en donne pas)
+        """
+        self.timeout = timeout
+        self.adapter = HTTPAdapter(
+            pool_connections=pool_connections,
+            pool_maxsize=pool_maxsize,
+            max_retries=0,
+        )
+        self.session = requests.Session()
+        self.session.mount("https://", self.adapter)
+        self.session.mount("http://", self.adapter)
+        self.session.headers["Accept-Encoding"] = ACCEPT_ENCODING
+
+        self.scheduler = HostScheduler(config.RATE_LIMITS)
+        self._lock = threading.Lock()
+        self._requests: Dict[str, int] = {}
+
+    def request(self, method: str, url: str, source: str = None, **kwargs) -> requests.Response:
+        """
+        Args:
+            source: Source à l'origine de la requête (clé de config.RATE_LIMITS).
+                Si donnée : politesse par hôte, retries et circuit breaker.
+                Par défaut : la source en cours de collecte, sinon (Telegram,
+                LLM) requête directe.
+        """
+        kwargs.setdefault("timeout", self.timeout)
+        source = source or current_source.get()
+        if not source:
+            return self._send(method, url, **kwargs)
+
+        host = urlparse(url).netloc
+        breaker = get_breaker()
+        if not breaker.allow(host):
+            raise CircuitOpenError(f"{host} : circuit ouvert (hôte en échec), requête sautée")
+
+        retries = config.HTTP_RETRIES_BY_SOURCE.get(source, config.HTTP_RETRIES)
+        try:
+            for attempt in range(retries + 1):
+                self.scheduler.wait(host, source)
+                retry_after = None
+                try:
+                    resp = self._send(method, url, **kwargs)
+                except requests.exceptions.Timeout:
+                    breaker.record_failure(host)
+                    raise
+                except requests.exceptions.ConnectionError as e:
+                    error = e
+                else:
+                    if resp.status_code not in RETRY_STATUSES:
+                        breaker.record_success(host)
+                        return resp
+                    error = resp
+                    retry_after = resp.headers.get("Retry-After")
+
+                if attempt < retries:
+                    time.sleep(backoff_delay(attempt, retry_after))
+
+            # 429 = quota (suivi par x_quota / la politesse), pas un hôte en échec
+            if not (isinstance(error, requests.Response) and error.status_code == 429):
+                breaker.record_failure(host)
+            if isinstance(error, requests.Response):
+                return error
+            raise error
+        finally:
+            # Autres exceptions (redirections, encodage...) : libère la requête de test
+            breaker.release(host)
+
+    def _send(self, method: str, url: str, **kwargs) -> requests.Response:
+        host = urlparse(url).netloc
+        with self._lock:
+            self._requests[host] = self._requests.get(host, 0) + 1
+        return self.session.request(method, url, **kwargs)
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url: str, **kwargs) -> requests.Response:
+        return self.request("POST", url, **kwargs)
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        """Par hôte : requêtes envoyées et connexions réellement ouvertes"""
+        opened: Dict[str, int] = {}
+        pools = self.adapter.poolmanager.pools
+        for key in list(pools.keys()):
+            pool = pools.get(key)
+            if pool is not None:
+                opened[pool.host] = opened.get(pool.host, 0) + pool.num_connections
+
+        with self._lock:
+            requests_by_host = dict(self._requests)
+
+        stats = {}
+        for host, count in requests_by_host.items():
+            hostname = host.split(":")[0]
+            stats[host] = {"requests": count, "connections": opened.get(hostname, 0)}
+        return stats
+
+    def report(self) -> str:
+        stats = self.stats()
+        total = sum(s["requests"] for s in stats.values())
+        if not total:
+            return "🔌 HTTP : aucune requête"
+        connections = sum(s["connections"] for s in stats.values())
+        reused = max(0, total - connections)
+        return (
+            f"🔌 HTTP : {total} requêtes sur {connections} connexions "
+            f"({len(stats)} hôtes) — {reused / total * 100:.0f}% de réutilisation"
+        )
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_client() -> HTTPClient:
+    """Client partagé par tout le process (créé au premier appel)"""
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = HTTPClient()
+        return _client
+
+
+def get(url: str, **kwargs) -> requests.Response:
+    return get_client().get(url, **kwargs)
+
+
+def post(url: str, **kwargs) -> requests.Response:
+    return get_client().post(url, **kwargs)
+
+
+def add_rate_limit(source: str, rule: Dict):
+    """Politesse par défaut d'une source enregistrée (config.RATE_LIMITS reste prioritaire)"""
+    get_client().scheduler.add_policy(source, rule)
+
+
+def report() -> str:
+    return get_client().report()
+
+
+def breaker_report() -> str:
+    return get_breaker().report()
@@ -12,9 +12,12 @@ Génère :
 """
 import os
 import requests
+import http_client
 from typing import Optional, List, Dict
 from dotenv import load_dotenv
 
+from sources.summaries import full_summary
+
 load_dotenv(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".env"))
 
 # ═══ Providers ═══
@@ -134,7 +137,7 @@ Pas de markdown. Pas d'explication. Juste les titres traduits."""
         for i, item in enumerate(items):
             n = i + 1  # Numérotation locale au batch (toujours 1-based)
             title = item.get("title", "")[:200]
-            summary = item.get("summary", "")[:400]
+            summary = full_summary(item)[:400]
             source = item.get("source", "")
             link = item.get("link", "")[:120]
             items_block += f"\n[{n}] ({source}) {title}\n    Contexte: {summary}\n    Lien: {link}\n"
@@ -210,7 +213,7 @@ Réponds UNIQUEMENT avec le paragraphe. Rien d'autre."""
         context = ""
         for item in items[:5]:
             title = item.get("title", "")[:100]
-            summary = item.get("ai_summary", item.get("summary", ""))[:150]
+            summary = (item["ai_summary"] if "ai_summary" in item else full_summary(item))[:150]
             context += f"- {title}: {summary}\n"
 
         prompt = f"""Actus IA du jour :
@@ -287,7 +290,7 @@ Réponds UNIQUEMENT avec l'idée."""
                 }
 
             timeout = 120 if "ollama.com" in url else 45
-            resp = requests.post(url, json=payload, headers=headers, timeout=timeout)
+            resp = http_client.post(url, json=payload, headers=headers, timeout=timeout)
 
             if resp.status_code == 200:
                 data = resp.json()
@@ -7,7 +7,7 @@ Récupère TOUTES les commandes en attente et les traite d'un coup.
 import os
 import sys
 import json
-import requests
+import http_client
 
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
@@ -110,7 +110,7 @@ def main():
     print(f"📥 Récupération des commandes (offset: {offset})...")
 
     try:
-        resp = requests.get(
+        resp = http_client.get(
             f"{api}/getUpdates",
             params={"offset": offset, "timeout": 5, "allowed_updates": json.dumps(["message"])},
             timeout=10,
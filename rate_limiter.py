@@ -0,0 +1,69 @@
+"""
+AliDonerBot — Politesse par hôte
+Remplace les time.sleep() éparpillés dans les fetchers : chaque hôte a
+son propre planning (espacement minimum + token bucket optionnel), donc
+deux requêtes vers des serveurs différents ne s'attendent jamais.
+Les règles sont définies par source dans config.RATE_LIMITS.
+"""
+import time
+import threading
+from dataclasses import dataclass
+from typing import Dict, Optional
+
+
+@dataclass
+class RateLimit:
+    min_interval: float = 0.0     # Secondes mini entre 2 requêtes au même hôte
+    rate: Optional[float] = None  # Token bucket : requêtes/seconde (None = pas de bucket)
+    burst: int = 1                # Token bucket : taille max du bucket
+
+
+@dataclass
+class _HostState:
+    next_slot: float = 0.0
+    tokens: float = 0.0
+    last_refill: float = 0.0
+
+
+class HostScheduler:
+    def __init__(self, policies: Dict[str, Dict]):
+        self.policies = {name: RateLimit(**rule) for name, rule in policies.items()}
+        self._lock = threading.Lock()
+        self._hosts: Dict[str, _HostState] = {}
+
+    def add_policy(self, name: str, rule: Dict):
+        """Règle par défaut d'une source (sans effet si la config la définit déjà)"""
+        with self._lock:
+            self.policies.setdefault(name, RateLimit(**rule))
+
+    def wait(self, host: str, policy: str) -> float:
+        """
+        Réserve le prochain créneau libre pour `host` et dort jusque-là.
+        Returns: secondes attendues
+        """
+        rule = self.policies.get(policy)
+        if rule is None:
+            return 0.0
+
+        with self._lock:
+            now = time.monotonic()
+            state = self._hosts.get(host)
+            if state is None:
+                state = self._hosts[host] = _HostState(tokens=rule.burst, last_refill=now)
+
+            slot = max(now, state.next_slot)
+
+            if rule.rate:
+                tokens = min(rule.burst, state.tokens + (slot - state.last_refill) * rule.rate)
+                if tokens < 1:
+                    slot += (1 - tokens) / rule.rate
+                    tokens = 1
+                state.tokens = tokens - 1
+                state.last_refill = slot
+
+            state.next_slot = slot + rule.min_interval
+
+        delay = slot - now
+        if delay > 0:
+            time.sleep(delay)
+        return max(0.0, delay)
@@ -0,0 +1,113 @@
+"""
+AliDonerBot — Fiabilité réseau par hôte
+  - Retry des erreurs transitoires (connexion, 429, 5xx) avec backoff
+    exponentiel plafonné + jitter
+  - Circuit breaker : un hôte qui échoue en boucle est « ouvert » et sauté
+    instantanément (état gardé entre les runs) jusqu'à ce qu'une requête
+    de test (half-open) réussisse après le cooldown.
+"""
+import time
+import random
+import threading
+from typing import Optional, Set
+
+import requests
+
+import config
+from state_store import JsonStore
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+class CircuitOpenError(requests.exceptions.ConnectionError):
+    """Hôte connu comme mort : requête non envoyée"""
+
+
+def backoff_delay(attempt: int, retry_after: Optional[str] = None) -> float:
+    """Backoff exponentiel plafonné, full jitter (ou Retry-After s'il est raisonnable)"""
+    cap = config.HTTP_BACKOFF_CAP
+    if retry_after:
+        try:
+            return min(cap, float(retry_after))
+        except ValueError:
+            pass
+    return random.uniform(0, min(cap, config.HTTP_BACKOFF_BASE * 2 ** attempt))
+
+
+class CircuitBreaker:
+    """
+    Format : {host: {"failures": n, "opened_at": ts|None, "cooldown": s}}
+    closed → (N échecs consécutifs) → open → (cooldown écoulé) → half-open
+    → 1 requête de test : succès = closed, échec = open (cooldown doublé)
+    Un 429 n'est pas un échec : c'est un quota, pas un hôte mort.
+    """
+
+    def __init__(self, name: str = "circuit_breakers"):
+        self.store = JsonStore(name)
+        self._probing: Set[str] = set()
+        self._skipped: Set[str] = set()
+
+    def allow(self, host: str) -> bool:
+        with self.store.lock:
+            record = self.store.data.get(host)
+            if not record or record.get("opened_at") is None:
+                return True
+            if time.time() - record["opened_at"] < record["cooldown"]:
+                self._skipped.add(host)
+                return False
+            # Half-open : une seule requête de test à la fois
+            if host in self._probing:
+                self._skipped.add(host)
+                return False
+            self._probing.add(host)
+            return True
+
+    def record_success(self, host: str):
+        with self.store.lock:
+            self._probing.discard(host)
+            if host in self.store.data:
+                del self.store.data[host]
+                self.store.mark_dirty()
+
+    def release(self, host: str):
+        """Fin de requête sans verdict : un autre test half-open pourra partir"""
+        with self.store.lock:
+            self._probing.discard(host)
+
+    def record_failure(self, host: str):
+        with self.store.lock:
+            record = self.store.data.setdefault(
+                host, {"failures": 0, "opened_at": None, "cooldown": config.BREAKER_COOLDOWN},
+            )
+            record["failures"] += 1
+            if host in self._probing:
+                # La requête de test a échoué : on rouvre, cooldown doublé
+                self._probing.discard(host)
+                record["opened_at"] = time.time()
+                record["cooldown"] = min(record["cooldown"] * 2, config.BREAKER_MAX_COOLDOWN)
+            elif record["failures"] >= config.BREAKER_THRESHOLD and record["opened_at"] is None:
+                record["opened_at"] = time.time()
+                print(f"    ⛔ {host} : {record['failures']} échecs consécutifs — circuit ouvert")
+            self.store.mark_dirty()
+
+    def report(self) -> str:
+        with self.store.lock:
+            open_hosts = sorted(h for h, r in self.store.data.items() if r.get("opened_at"))
+        if not open_hosts:
+            return "⛔ Circuits : tous les hôtes OK"
+        return (
+            f"⛔ Circuits ouverts : {len(open_hosts)} hôte(s) ({', '.join(open_hosts)}) — "
+            f"{len(self._skipped)} sauté(s) ce run"
+        )
+
+
+_breaker = None
+_breaker_lock = threading.Lock()
+
+
+def get_breaker() -> CircuitBreaker:
+    global _breaker
+    with _breaker_lock:
+        if _breaker is None:
+            _breaker = CircuitBreaker()
+        return _breaker
@@ -0,0 +1,303 @@
+"""
+Parser RSS 2.0 / Atom rapide, en streaming sur les octets bruts de la réponse.
+Les fetchers ne gardent que les N premières entrées (20 RSS, 10 Reddit,
+3 Twitter) : on lit le document par morceaux et on s'arrête dès qu'on les a
+(ou dès la date limite), au lieu de laisser feedparser tout convertir.
+
+Les champs lus par les fetchers (title, link, id, summary, content, dates,
+tags) sont calculés avec les règles et les helpers de feedparser (résolution
+d'URLs relatives, sanitizer HTML, parsing des dates), donc les entrées sont
+identiques. Tout ce qui sort du cas simple (RSS 1.0, xml:base, XHTML inline,
+encodage non UTF-8, éléments qui modifient ces champs...) repasse par
+feedparser.parse sur le document complet.
+"""
+import re
+import xml.etree.ElementTree as ET
+from typing import Dict, List, Optional
+
+import feedparser
+
+from sources import timestamps
+
+try:
+    from feedparser.datetimes import _parse_date
+    from feedparser.html import _cp1252
+    from feedparser.mixin import _FeedParserMixin
+    from feedparser.sanitizer import _sanitize_html
+    from feedparser.urls import _urljoin, make_safe_absolute_uri, resolve_relative_uris
+    from feedparser.util import FeedParserDict
+    FAST_PATH = True
+except ImportError:  # Autre version de feedparser : on garde le parse complet
+    FAST_PATH = False
+
+CHUNK_SIZE = 16 * 1024
+
+_ATOM = "{http://www.w3.org/2005/Atom}"
+_CONTENT = "{http://purl.org/rss/1.0/modules/content/}"
+_DC = "{http://purl.org/dc/elements/1.1/}"
+_MEDIA = "{http://search.yahoo.com/mrss/}"
+_XML_BASE = "{http://www.w3.org/XML/1998/namespace}base"
+
+# Enfants d'entrée sans effet sur les champs lus par les fetchers
+_HARMLESS = {
+    "author", "comments", "enclosure", f"{_DC}creator",
+    f"{_MEDIA}thumbnail", f"{_MEDIA}content",
+    "{http://purl.org/rss/1.0/modules/slash/}comments",
+    "{http://wellformedweb.org/CommentAPI/}commentRss",
+    f"{_ATOM}author", f"{_ATOM}contributor",
+}
+_RSS_FIELDS = {
+    "title": "title", "link": "link", "guid": "id", "description": "summary",
+    f"{_CONTENT}encoded": "content", "pubDate": "published", f"{_DC}date": "updated",
+}
+_ATOM_FIELDS = {
+    f"{_ATOM}title": "title", f"{_ATOM}id": "id", f"{_ATOM}summary": "summary",
+    f"{_ATOM}content": "content", f"{_ATOM}published": "published", f"{_ATOM}updated": "updated",
+}
+# Type de contenu par défaut (feedparser push_content)
+_DEFAULT_TYPES = {
+    ("rss", "title"): "text/plain", ("rss", "summary"): "text/html", ("rss", "content"): "text/html",
+    ("atom", "title"): "text/plain", ("atom", "summary"): "text/plain", ("atom", "content"): "text/plain",
+}
+_DECLARED_ENCODING_RE = re.compile(rb'^<\?xml[^>]*encoding=["\']([A-Za-z0-9._-]+)["\']')
+_CHARSET_RE = re.compile(r'charset=["\']?([A-Za-z0-9._-]+)', re.I)
+
+
+class _Fallback(Exception):
+    """Document hors du cas simple : parse complet par feedparser"""
+
+
+def parse(
+    content: bytes, limit: Optional[int] = None, cutoff_ts: Optional[float] = None,
+    headers: Optional[Dict] = None,
+):
+    """
+    Équivalent de `feedparser.parse(content, response_headers=headers)`
+    limité aux `limit` premières entrées. Avec `cutoff_ts`, on s'arrête aussi
+    à la première entrée plus vieille que la limite tant que le flux est
+    trié du plus récent au plus ancien.
+    """
+    headers = {k.lower(): v for k, v in (headers or {}).items()}
+    if FAST_PATH and isinstance(content, bytes):
+        try:
+            return FeedParserDict(bozo=0, entries=_parse_fast(content, limit, cutoff_ts, headers))
+        except Exception:
+            # _Fallback, XML invalide, ou helpers internes de feedparser qui ont
+            # changé (version non épinglée) : le parse complet reste la référence
+            pass
+    return feedparser.parse(content, response_headers=headers)
+
+
+def _parse_fast(content: bytes, limit: Optional[int], cutoff_ts: Optional[float], headers: Dict) -> List:
+    _check_encoding(content, headers)
+    baseuri = make_safe_absolute_uri("", headers.get("content-location", "")) or ""
+
+    parser = ET.XMLPullParser(events=("start", "end"))
+    entries = []
+    flavor = None
+    depth = 0
+    last_ts = None
+    descending = True  # Dates rencontrées jusqu'ici du plus récent au plus ancien
+
+    for start in range(0, len(content), CHUNK_SIZE):
+        parser.feed(content[start:start + CHUNK_SIZE])
+        for event, elem in parser.read_events():
+            if event == "start":
+                depth += 1
+                if _XML_BASE in elem.attrib:
+                    raise _Fallback()
+                if depth == 1:
+                    flavor = _flavor(elem)
+                continue
+
+            depth -= 1
+            if not _is_entry(elem, flavor, depth):
+                continue
+
+            entry = _build_entry(elem, flavor, baseuri)
+            elem.clear()
+            ts = _entry_ts(entry)
+            if ts is not None:
+                descending = descending and (last_ts is None or ts <= last_ts)
+                last_ts = ts
+            entries.append(entry)
+            if descending and cutoff_ts is not None and ts is not None and ts < cutoff_ts:
+                # Flux trié : les entrées suivantes sont plus vieilles encore
+                return entries
+            if limit is not None and len(entries) >= limit:
+                return entries
+
+    parser.close()
+    if flavor is None:
+        raise _Fallback()
+    return entries
+
+
+def _check_encoding(content: bytes, headers: Dict):
+    if content[:2] in (b"\xff\xfe", b"\xfe\xff"):
+        raise _Fallback()
+    declared = _DECLARED_ENCODING_RE.match(content.lstrip(b"\xef\xbb\xbf"))
+    if declared and declared.group(1).lower() not in (b"utf-8", b"utf8"):
+        raise _Fallback()
+    charset = _CHARSET_RE.search(headers.get("content-type", ""))
+    if charset and charset.group(1).lower() not in ("utf-8", "utf8"):
+        raise _Fallback()
+
+
+def _flavor(root) -> str:
+    if root.tag == "rss" and root.get("version", "").startswith("2."):
+        return "rss"
+    if root.tag == f"{_ATOM}feed":
+        return "atom"
+    raise _Fallback()
+
+
+def _is_entry(elem, flavor: str, depth: int) -> bool:
+    # rss > channel > item (profondeur 2) ; feed > entry (profondeur 1)
+    if flavor == "rss":
+        return depth == 2 and elem.tag == "item"
+    return depth == 1 and elem.tag == f"{_ATOM}entry"
+
+
+def _build_entry(elem, flavor: str, baseuri: str):
+    fields = _RSS_FIELDS if flavor == "rss" else _ATOM_FIELDS
+    raw: Dict[str, object] = {}
+    tags = []
+    alternate = None
+
+    for child in elem:
+        if child.tag in _HARMLESS:
+            continue
+        if child.tag in ("category", f"{_ATOM}category"):
+            _add_category(tags, child)
+            continue
+        if flavor == "atom" and child.tag == f"{_ATOM}link":
+            href = _atom_link(child, baseuri)
+            if href is not None:
+                if alternate is not None:
+                    raise _Fallback()
+                alternate = href
+            continue
+        key = fields.get(child.tag)
+        if key is None or key in raw or len(child):
+            raise _Fallback()
+        raw[key] = child
+
+    entry = FeedParserDict()
+    if tags:
+        entry["tags"] = tags
+
+    for key in ("title", "summary", "content"):
+        if key in raw:
+            value = _text_field(raw[key], flavor, key, baseuri)
+            entry[key] = value if key != "content" else [FeedParserDict(value=value)]
+
+    # Atom : <content> recopié dans summary quand il n'y a pas de <summary>
+    if "summary" not in entry and "content" in entry:
+        entry["summary"] = entry["content"][0]["value"]
+
+    if "id" in raw:
+        guid = raw["id"]
+        guidislink = _attrs(guid).get("ispermalink", "true") == "true"
+        value = (guid.text or "").strip()
+        if guidislink and value:
+            value = _urljoin(baseuri, value)
+        value = _fix_encoding(value)
+        entry["id"] = value
+        if guidislink:
+            entry["link"] = value
+
+    if "link" in raw:
+        link = (raw["link"].text or "").strip()
+        if link:
+            link = _urljoin(baseuri, link)
+        link = _fix_encoding(link).replace("&amp;", "&")
+        entry["link"] = re.sub("&([A-Za-z0-9_]+);", r"&\g<1>", link)
+    if alternate is not None:
+        entry["link"] = alternate
+
+    for key in ("published", "updated"):
+        if key in raw:
+            value = _fix_encoding((raw[key].text or "").strip())
+            entry[key] = value
+            entry[f"{key}_parsed"] = _parse_date(value)
+
+    return entry
+
+
+def _text_field(elem, flavor: str, key: str, baseuri: str) -> str:
+    """Texte d'un élément avec le traitement de feedparser (pop)"""
+    attrs = _attrs(elem)
+    content_type = _FeedParserMixin.map_content_type(
+        attrs.get("type", _DEFAULT_TYPES[(flavor, key)])
+    )
+    if attrs.get("mode") == "base64" or content_type == "application/xhtml+xml":
+        raise _Fallback()
+    if key == "content" and content_type not in ("text/plain", "text/html"):
+        raise _Fallback()
+
+    output = (elem.text or "").strip()
+    if flavor == "rss" and content_type == "text/plain" and _FeedParserMixin.looks_like_html(output):
+        content_type = "text/html"
+    if content_type == "text/html":
+        output = resolve_relative_uris(output, baseuri, "utf-8", content_type)
+        output = _sanitize_html(output, "utf-8", content_type)
+    return _fix_encoding(output)
+
+
+def _fix_encoding(output: str) -> str:
+    # Mêmes corrections que feedparser : UTF-8 lu comme latin-1, puis cp1252
+    try:
+        output = output.encode("iso-8859-1").decode("utf-8")
+    except (UnicodeEncodeError, UnicodeDecodeError):
+        pass
+    return output.translate(_cp1252)
+
+
+def _attrs(elem) -> Dict[str, str]:
+    # feedparser met les noms d'attributs en minuscules
+    return {k.lower(): v for k, v in elem.attrib.items()}
+
+
+def _add_category(tags: list, elem):
+    """Même logique que feedparser (_start_category / _end_category)"""
+    if len(elem):
+        raise _Fallback()
+    attrs = _attrs(elem)
+    _add_tag(tags, attrs.get("term"), attrs.get("scheme", attrs.get("domain")), attrs.get("label"))
+    value = _fix_encoding((elem.text or "").strip())
+    if not value:
+        return
+    if tags and not tags[-1]["term"]:
+        tags[-1]["term"] = value
+    else:
+        _add_tag(tags, value, None, None)
+
+
+def _add_tag(tags: list, term, scheme, label):
+    if term is None and scheme is None and label is None:
+        return
+    value = FeedParserDict(term=term, scheme=scheme, label=label)
+    if value not in tags:
+        tags.append(value)
+
+
+def _atom_link(elem, baseuri: str) -> Optional[str]:
+    """href d'un <link> Atom s'il sert de lien principal (alternate + HTML)"""
+    attrs = _attrs(elem)
+    rel = attrs.get("rel", "alternate")
+    link_type = attrs.get("type", "application/atom+xml" if rel == "self" else "text/html")
+    href = attrs.get("href")
+    if href is None:
+        raise _Fallback()
+    if rel != "alternate" or _FeedParserMixin.map_content_type(link_type) not in _FeedParserMixin.html_types:
+        return None
+    return _urljoin(baseuri, href)
+
+
+def _entry_ts(entry) -> Optional[int]:
+    # Même lecture que les fetchers (published puis updated, en UTC)
+    for key in ("published_parsed", "updated_parsed"):
+        if entry.get(key):
+            return timestamps.from_struct(entry[key])
+    return None
@@ -1,11 +1,133 @@
 """
 Fetch trending AI repositories from GitHub (HTML scraping)
 """
-import requests
-from bs4 import BeautifulSoup
-from datetime import datetime
-from typing import List, Dict
+import re
 import time
+import http_client
+from bs4 import BeautifulSoup, SoupStrainer
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta
+from typing import List, Dict, Optional
+
+import config
+from sources import parse_pool
+from sources.registry import Window, in_thread, register
+from state_store import JsonStore
+
+try:
+    import lxml  # noqa: F401  (backend plus rapide si installé)
+    _PARSER = 'lxml'
+except ImportError:
+    _PARSER = 'html.parser'
+
+TOP_N = 10        # Repos gardés par page trending
+MAX_WORKERS = 4   # Pages topics récupérées en parallèle
+
+
+def _has_box_row(classes) -> bool:
+    """Box-row parmi les classes (chaîne brute pendant le parse, liste ensuite)"""
+    if not classes:
+        return False
+    tokens = classes.split() if isinstance(classes, str) else classes
+    return 'Box-row' in tokens
+
+
+# Parsing rapide : seuls les blocs <article class="Box-row"> sont construits,
+# et le HTML est coupé après le N-ième (le reste de la page est ignoré).
+# Box-row comme classe entière (pas Box-row--focus), des deux côtés.
+_ARTICLES = SoupStrainer('article', class_=_has_box_row)
+_ARTICLE_START_RE = re.compile(r'<article\b[^>]*\bclass\s*=\s*["\']([^"\']*\s)?Box-row(?=["\'\s])')
+
+# Snapshots quotidiens par page (les pages trending changent ~1 fois/jour) :
+# un 2e appel le même jour est servi localement, et la comparaison avec les
+# jours précédents donne la vélocité (stars/jour) utilisée pour le classement.
+SNAPSHOT_KEEP_DAYS = 8
+_PERIOD_DAYS = {"daily": 1, "weekly": 7, "monthly": 30}
+_COUNT_RE = re.compile(r'([\d.,]+)\s*([kK]?)')
+
+# {"topic:since": {"YYYY-MM-DD": [entries]}}
+_snapshots = JsonStore("github_snapshots")
+
+
+def _parse_count(text: str) -> int:
+    """'1,234' → 1234, '1.2k' → 1200, '56 stars today' → 56"""
+    match = _COUNT_RE.search(text or '')
+    if not match:
+        return 0
+    number = match.group(1).replace(',', '')
+    try:
+        value = float(number)
+    except ValueError:
+        return 0
+    return int(value * 1000) if match.group(2) else int(value)
+
+
+def parse_page(html: str, topic: str, since: str) -> List[Dict]:
+    """Entrées d'une page trending (fonction pure : exécutable dans un worker)"""
+    entries = []
+    for article in _parse_articles(html, TOP_N):
+        entry = _article_entry(article, topic, since)
+        if entry:
+            entries.append(entry)
+    return entries
+
+
+def _article_entry(article, topic: str, since: str) -> Optional[Dict]:
+    """Entrée d'un bloc article.Box-row (None si pas de lien de repo)"""
+    # Get repo name
+    h2 = article.find('h2')
+    if not h2:
+        return None
+
+    a_tag = h2.find('a')
+    if not a_tag:
+        return None
+
+    repo_path = a_tag.get('href', '').strip('/')
+    if not repo_path:
+        return None
+
+    # Get description
+    p = article.find('p', class_='col-9')
+    description = p.get_text(strip=True) if p else ""
+
+    # Get language
+    lang_span = article.find('span', itemprop='programmingLanguage')
+    language = lang_span.get_text(strip=True) if lang_span else "Unknown"
+
+    # Get stars
+    stars_link = article.find('a', class_='Link--muted')
+    stars = "0"
+    if stars_link:
+        stars = stars_link.get_text(strip=True).replace(',', '')
+
+    # Stars gagnées sur la période ("123 stars today")
+    period_span = article.find('span', class_='float-sm-right')
+    period_stars = _parse_count(period_span.get_text(strip=True)) if period_span else 0
+
+    return {
+        'source': f'GitHub Trending {topic or ""}',
+        'title': f"{repo_path} ({language}, ⭐{stars})",
+        'link': f"https://github.com/{repo_path}",
+        'summary': description[:200],
+        'published': datetime.now().isoformat(),
+        'published_ts': int(time.time()),
+        'type': 'github',
+        'score': _parse_count(stars),
+        'stars': _parse_count(stars),
+        'stars_per_day': round(period_stars / _PERIOD_DAYS.get(since, 1), 1),
+    }
+
+
+def _parse_articles(html: str, limit: int) -> list:
+    """Les `limit` premiers article.Box-row de la page"""
+    starts = [m.start() for m in _ARTICLE_START_RE.finditer(html)]
+    if starts:
+        end = starts[limit] if len(starts) > limit else len(html)
+        html = html[starts[0]:end]
+    soup = BeautifulSoup(html, _PARSER, parse_only=_ARTICLES)
+    return soup.find_all('article', class_='Box-row', limit=limit)
+
 
 class GitHubTrendingFetcher:
     def __init__(self):
@@ -15,77 +137,82 @@ class GitHubTrendingFetcher:
         }
 
     def fetch_trending(self, topic: str = None, since: str = "daily") -> List[Dict]:
-        """Fetch trending repos for a topic"""
+        """Fetch trending repos for a topic (snapshot du jour si déjà scrapé)"""
+        key = f"{topic or '*'}:{since}"
+        today = date.today().isoformat()
+        with _snapshots.lock:
+            snapshot = _snapshots.data.get(key, {}).get(today)
+            if snapshot is not None:
+                return [dict(entry) for entry in snapshot]
+
+        entries = self._scrape(topic, since)
+        if entries:
+            self._add_velocity(entries, today, since)
+            self._store_snapshot(key, today, entries)
+        return entries
+
+    def _scrape(self, topic: str, since: str) -> List[Dict]:
         try:
             if topic:
                 url = f"{self.base_url}/{topic}?since={since}"
             else:
                 url = f"{self.base_url}?since={since}"
 
-            response = requests.get(url, headers=self.headers, timeout=10)
+            response = http_client.get(url, headers=self.headers, timeout=10, source="github")
             response.raise_for_status()
 
-            soup = BeautifulSoup(response.text, 'html.parser')
-            articles = soup.find_all('article', class_='Box-row')
-
-            entries = []
-            for article in articles[:10]:  # Top 10
-                # Get repo name
-                h2 = article.find('h2')
-                if not h2:
-                    continue
-
-                a_tag = h2.find('a')
-                if not a_tag:
-                    continue
-
-                repo_path = a_tag.get('href', '').strip('/')
-                if not repo_path:
-                    continue
-
-                # Get description
-                p = article.find('p', class_='col-9')
-                description = p.get_text(strip=True) if p else ""
-
-                # Get language
-                lang_span = article.find('span', itemprop='programmingLanguage')
-                language = lang_span.get_text(strip=True) if lang_span else "Unknown"
-
-                # Get stars
-                stars_link = article.find('a', class_='Link--muted')
-                stars = "0"
-                if stars_link:
-                    stars = stars_link.get_text(strip=True).replace(',', '')
-
-                entries.append({
-                    'source': f'GitHub Trending {topic or ""}',
-                    'title': f"{repo_path} ({language}, ⭐{stars})",
-                    'link': f"https://github.com/{repo_path}",
-                    'summary': description[:200],
-                    'published': datetime.now().isoformat(),
-                    'type': 'github',
-                    'score': int(stars.replace('k', '000').replace('.', '')) if stars else 0,
-                })
-
-            time.sleep(0.5)
-            return entries
+            # BeautifulSoup (CPU) dans le pool de processus s'il est activé
+            return parse_pool.run(parse_page, response.text, topic, since)
 
         except Exception as e:
             print(f"    ✗ Error fetching GitHub trending: {e}")
             return []
 
+    @staticmethod
+    def _add_velocity(entries: List[Dict], today: str, since: str):
+        """
+        Stars/jour d'après le dernier snapshot antérieur contenant le repo
+        (toutes pages confondues). Sans historique, on garde le compteur
+        de période affiché par GitHub.
+        """
+        with _snapshots.lock:
+            history: Dict[str, tuple] = {}
+            for days in _snapshots.data.values():
+                for day, snapshot in days.items():
+                    if day >= today:
+                        continue
+                    for entry in snapshot:
+                        previous = history.get(entry['link'])
+                        if previous is None or day > previous[0]:
+                            history[entry['link']] = (day, entry.get('stars', 0))
+
+        for entry in entries:
+            previous = history.get(entry['link'])
+            if previous is None:
+                continue
+            elapsed = (date.fromisoformat(today) - date.fromisoformat(previous[0])).days
+            entry['stars_per_day'] = round(max(entry['stars'] - previous[1], 0) / elapsed, 1)
+
+    @staticmethod
+    def _store_snapshot(key: str, today: str, entries: List[Dict]):
+        oldest = (date.today() - timedelta(days=SNAPSHOT_KEEP_DAYS)).isoformat()
+        with _snapshots.lock:
+            days = _snapshots.data.setdefault(key, {})
+            days[today] = entries
+            for day in [d for d in days if d < oldest]:
+                del days[day]
+            _snapshots.mark_dirty()
+
     def fetch_all(self, topics: List[str]) -> List[Dict]:
         """Fetch trending repos for multiple topics"""
         print("  📡 Fetching GitHub Trending...")
         all_entries = []
 
-        for topic in topics:
-            entries = self.fetch_trending(topic)
-            all_entries.extend(entries)
-
-        # Also fetch general trending
-        general = self.fetch_trending()
-        all_entries.extend(general)
+        # Topics + trending général en parallèle, fusionnés dans l'ordre
+        pages = list(topics) + [None]
+        with ThreadPoolExecutor(max_workers=MAX_WORKERS) as pool:
+            for entries in pool.map(self.fetch_trending, pages):
+                all_entries.extend(entries)
 
         # Remove duplicates
         seen = set()
@@ -96,8 +223,15 @@ class GitHubTrendingFetcher:
                 seen.add(link)
                 unique.append(entry)
 
-        # Sort by score
-        unique.sort(key=lambda x: x.get('score', 0), reverse=True)
+        # Sort by velocity (stars/jour), puis stars totales
+        unique.sort(key=lambda x: (x.get('stars_per_day', 0), x.get('score', 0)), reverse=True)
 
         print(f"    ✓ Got {len(unique)} trending repos")
         return unique[:15]
+
+
+@register("github", "GitHub Trending", cost=len(config.GITHUB_TOPICS))
+async def fetch_github(window: Window, topics: List[str] = None) -> List[Dict]:
+    """Trending du jour : la fenêtre ne change pas les pages lues"""
+    topics = config.GITHUB_TOPICS if topics is None else topics
+    return await in_thread(GitHubTrendingFetcher().fetch_all, topics)
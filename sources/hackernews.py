@@ -1,76 +1,287 @@
 """
 Fetch AI-related stories from Hacker News via Algolia API (free, no key needed)
 """
-import requests
-from datetime import datetime, timedelta
-from typing import List, Dict
+import re
 import time
+import http_client
+from typing import List, Dict, Optional, Callable
+
+import config
+from sources import timestamps
+from sources.registry import Window, in_thread, register
+from state_store import JsonStore
+
+# Mode batch : une seule requête récupère les stories de la fenêtre ayant au
+# moins config.HN_BATCH_MIN_POINTS points, puis on les rattache localement
+# aux queries.
+BATCH_MAX_HITS = 1000  # Limite de pagination Algolia (hitsPerPage max)
+# Une fenêtre qui a dépassé une page le dépassera encore (ex : alertes, 24h à
+# points>=1) : mode par query directement, re-test du batch une fois par semaine.
+OVERFLOW_RETEST = 7 * 86400
+
+# Mode incrémental : on ne redemande que les stories plus récentes que le
+# watermark (created_at_i max déjà vu), moins une marge où les points bougent
+# encore ; le reste de la fenêtre vient de l'état local.
+WATERMARK_OVERLAP = 6 * 3600
+STATE_KEEP = 8 * 86400  # Hits gardés 8 jours (fenêtre hebdo incluse)
+
+_WORD_RE = re.compile(r'[a-z0-9]+')
+_HIT_FIELDS = ('objectID', 'title', 'url', 'points', 'num_comments', 'created_at_i')
+# Champs renvoyés par Algolia : pas de _highlightResult ni d'auteur, tags...
+_RETRIEVE = {
+    'attributesToRetrieve': ','.join(_HIT_FIELDS + ('story_text',)),
+    'attributesToHighlight': '[]',
+}
+
+# {clé: {"watermark": ts, "covered_from": ts, "hits": [...]}}
+_watermarks = JsonStore("hn_watermarks")
+
 
 class HackerNewsFetcher:
-    def __init__(self):
+    def __init__(self, batch: bool = True, incremental: bool = True):
         self.base_url = "https://hn.algolia.com/api/v1/search"
+        self.batch = batch
+        self.incremental = incremental
+        self.state = _watermarks
 
-    def search(self, query: str, days_back: int = 2, hits_per_page: int = 10) -> List[Dict]:
+    def search(
+        self, query: str, days_back: int = 2, hits_per_page: int = 10, since_ts: Optional[float] = None,
+    ) -> List[Dict]:
         """Search HN for a specific query"""
         try:
             # Calculate timestamp for filtering
-            cutoff = datetime.now() - timedelta(days=days_back)
-            timestamp = int(cutoff.timestamp())
-
-            params = {
-                'query': query,
-                'tags': 'story',
-                'numericFilters': f'created_at_i>{timestamp}',
-                'hitsPerPage': hits_per_page,
-            }
+            timestamp = int(timestamps.window_start(days_back, since_ts))
+
+            def fetch(since: int) -> List[Dict]:
+                params = {
+                    'query': query,
+                    'tags': 'story',
+                    'numericFilters': f'created_at_i>{since}',
+                    'hitsPerPage': hits_per_page,
+                    **_RETRIEVE,
+                }
+                response = http_client.get(
+                    self.base_url, params=params, timeout=10, source="hackernews",
+                )
+                response.raise_for_status()
+                return response.json().get('hits', [])
 
-            response = requests.get(self.base_url, params=params, timeout=10)
-            response.raise_for_status()
+            hits = self._window_hits(f"query:{query}", timestamp, fetch)
+            hits.sort(key=lambda h: h.get('points', 0) or 0, reverse=True)
+            return [self._to_entry(hit, query) for hit in hits[:hits_per_page]]
+
+        except Exception as e:
+            print(f"    ✗ Error searching HN for '{query}': {e}")
+            return []
 
-            data = response.json()
-            hits = data.get('hits', [])
+    def search_batch(
+        self, queries: List[str], days_back: int = 2, hits_per_query: int = 10,
+        since_ts: Optional[float] = None, min_points: Optional[int] = None,
+    ) -> Optional[List[Dict]]:
+        """
+        Toutes les queries en UNE requête Algolia : on récupère les stories de
+        la fenêtre (>= min_points points, défaut config.HN_BATCH_MIN_POINTS)
+        puis on rattache chaque hit à la première query qui le matche.
 
-            entries = []
-            for hit in hits:
-                created_at = datetime.fromtimestamp(hit.get('created_at_i', 0))
+        Returns:
+            Les entries, ou None si la fenêtre dépasse une page (ex : hebdo)
+            → l'appelant repasse en mode une-requête-par-query.
+        """
+        try:
+            timestamp = int(timestamps.window_start(days_back, since_ts))
+            if min_points is None:
+                min_points = config.HN_BATCH_MIN_POINTS
+            key = f"batch:points>={min_points}"
+            if self._known_overflow(key, time.time() - timestamp):
+                return None
 
-                entries.append({
-                    'source': f'HN: {query}',
-                    'title': hit.get('title', ''),
-                    'link': hit.get('url') or f"https://news.ycombinator.com/item?id={hit.get('objectID')}",
-                    'summary': f"{hit.get('points', 0)} points, {hit.get('num_comments', 0)} comments",
-                    'published': created_at.isoformat(),
-                    'type': 'hackernews',
-                    'score': hit.get('points', 0),
-                })
+            def fetch(since: int) -> List[Dict]:
+                params = {
+                    'tags': 'story',
+                    'numericFilters': f'created_at_i>{since},points>={min_points}',
+                    'hitsPerPage': BATCH_MAX_HITS,
+                    **_RETRIEVE,
+                }
+                response = http_client.get(
+                    self.base_url, params=params, timeout=15, source="hackernews",
+                )
+                response.raise_for_status()
+                data = response.json()
+                hits = data.get('hits', [])
+                if data.get('nbHits', 0) > len(hits):
+                    self._record_overflow(key, time.time() - since)
+                    raise _WindowTooLarge(data.get('nbHits'))
+                return hits
 
-            time.sleep(0.3)  # Rate limiting
-            return entries
+            hits = self._window_hits(key, timestamp, fetch)
+            return self._assign_hits(hits, queries, hits_per_query)
 
+        except _WindowTooLarge as e:
+            print(f"    ⚠️  HN batch : {e} stories > 1 page — mode par query")
+            return None
         except Exception as e:
-            print(f"    ✗ Error searching HN for '{query}': {e}")
-            return []
+            print(f"    ✗ Error in HN batch search: {e}")
+            return None
 
-    def fetch_all(self, queries: List[str], days_back: int = 2) -> List[Dict]:
-        """Fetch stories for multiple queries"""
+    def fetch_all(
+        self, queries: List[str], days_back: int = 2, since_ts: Optional[float] = None,
+        min_points: Optional[int] = None,
+    ) -> List[Dict]:
+        """Fetch stories for multiple queries (depuis `since_ts` s'il est donné)"""
         print("  📡 Fetching Hacker News...")
-        all_entries = []
+        all_entries = None
 
-        for query in queries:
-            entries = self.search(query, days_back)
-            all_entries.extend(entries)
+        if self.batch:
+            all_entries = self.search_batch(queries, days_back, since_ts=since_ts, min_points=min_points)
+
+        if all_entries is None:
+            all_entries = []
+            for query in queries:
+                entries = self.search(query, days_back, since_ts=since_ts)
+                all_entries.extend(entries)
 
-        # Remove duplicates (same URL)
+        # Remove duplicates (same story or same URL)
+        seen_ids = set()
         seen_urls = set()
         unique_entries = []
         for entry in all_entries:
+            story_id = entry.get('hn_id')
             url = entry['link']
-            if url not in seen_urls:
-                seen_urls.add(url)
-                unique_entries.append(entry)
+            if story_id in seen_ids or url in seen_urls:
+                continue
+            seen_ids.add(story_id)
+            seen_urls.add(url)
+            unique_entries.append(entry)
 
         # Sort by score
         unique_entries.sort(key=lambda x: x.get('score', 0), reverse=True)
 
         print(f"    ✓ Got {len(unique_entries)} unique stories")
         return unique_entries[:20]  # Top 20
+
+    def _known_overflow(self, key: str, span: float) -> bool:
+        """Une fenêtre au moins aussi courte a déjà dépassé une page (re-test hebdo)"""
+        with self.state.lock:
+            overflow = self.state.data.get(f"overflow:{key}")
+        return bool(
+            overflow and span >= overflow['span'] and time.time() - overflow['at'] < OVERFLOW_RETEST
+        )
+
+    def _record_overflow(self, key: str, span: float):
+        with self.state.lock:
+            self.state.data[f"overflow:{key}"] = {'span': int(span), 'at': int(time.time())}
+            self.state.mark_dirty()
+
+    # ──────────────────────────────────────
+    # Mode incrémental : watermark par query (ou par scan batch)
+    # ──────────────────────────────────────
+
+    def _window_hits(self, key: str, cutoff_ts: int, fetch: Callable[[int], List[Dict]]) -> List[Dict]:
+        """
+        Hits de la fenêtre (cutoff_ts, maintenant] pour `key`.
+        Si l'état local couvre déjà le début de la fenêtre, on ne demande que
+        created_at_i > watermark - WATERMARK_OVERLAP et on fusionne avec les
+        hits stockés ; sinon, requête complète.
+        """
+        with self.state.lock:
+            window = self.state.data.get(key)
+
+        since = cutoff_ts
+        stored: List[Dict] = []
+        if self.incremental and window and window['covered_from'] <= cutoff_ts:
+            since = max(cutoff_ts, window['watermark'] - WATERMARK_OVERLAP)
+            # Hits de la marge : redemandés (points à jour), donc pas repris du cache
+            stored = [h for h in window['hits'] if cutoff_ts < h['created_at_i'] <= since]
+
+        fresh = [self._compact(h) for h in fetch(since)]
+        fresh_ids = {h['objectID'] for h in fresh}
+        hits = fresh + [h for h in stored if h['objectID'] not in fresh_ids]
+
+        keep_from = int(time.time()) - STATE_KEEP
+        kept = hits
+        if window and since > cutoff_ts:
+            # Garder aussi les hits plus vieux que la fenêtre (utiles au run hebdo)
+            kept = hits + [h for h in window['hits'] if keep_from < h['created_at_i'] <= cutoff_ts]
+        covered_from = min(cutoff_ts, window['covered_from']) if window and since > cutoff_ts else cutoff_ts
+
+        with self.state.lock:
+            self.state.data[key] = {
+                'watermark': max([h['created_at_i'] for h in hits] + [since]),
+                'covered_from': max(covered_from, keep_from),
+                'hits': kept,
+            }
+            self.state.mark_dirty()
+
+        if since > cutoff_ts:
+            print(f"    ↪ HN incrémental ({key}) : {len(fresh)} nouveaux + {len(hits) - len(fresh)} en local")
+        return hits
+
+    @staticmethod
+    def _compact(hit: Dict) -> Dict:
+        compact = {f: hit.get(f) for f in _HIT_FIELDS}
+        compact['created_at_i'] = compact['created_at_i'] or 0
+        if hit.get('story_text'):
+            compact['story_text'] = hit['story_text'][:500]
+        return compact
+
+    # ──────────────────────────────────────
+    # Mode batch : rattachement local hits → queries
+    # ──────────────────────────────────────
+
+    def _assign_hits(self, hits: List[Dict], queries: List[str], hits_per_query: int) -> List[Dict]:
+        """
+        Même logique qu'Algolia : tous les mots de la query doivent apparaître
+        (titre, URL ou texte), le dernier mot pouvant être un préfixe.
+        Un hit va à la première query qui le matche ; top N par points.
+        """
+        query_words = [_WORD_RE.findall(q.lower()) for q in queries]
+        by_query: Dict[str, List[Dict]] = {q: [] for q in queries}
+
+        for hit in hits:
+            text = f"{hit.get('title') or ''} {hit.get('url') or ''} {hit.get('story_text') or ''}"
+            words = set(_WORD_RE.findall(text.lower()))
+            for query, q_words in zip(queries, query_words):
+                if q_words and self._matches(q_words, words):
+                    by_query[query].append(hit)
+                    break
+
+        entries = []
+        for query in queries:
+            matched = sorted(by_query[query], key=lambda h: h.get('points', 0) or 0, reverse=True)
+            entries.extend(self._to_entry(hit, query) for hit in matched[:hits_per_query])
+        return entries
+
+    @staticmethod
+    def _matches(q_words: List[str], words: set) -> bool:
+        *full, last = q_words
+        if not all(w in words for w in full):
+            return False
+        return last in words or any(w.startswith(last) for w in words)
+
+    @staticmethod
+    def _to_entry(hit: Dict, query: str) -> Dict:
+        published_ts = int(hit.get('created_at_i', 0))
+        return {
+            'source': f'HN: {query}',
+            'title': hit.get('title', ''),
+            'link': hit.get('url') or f"https://news.ycombinator.com/item?id={hit.get('objectID')}",
+            'summary': f"{hit.get('points', 0)} points, {hit.get('num_comments', 0)} comments",
+            'published': timestamps.to_iso(published_ts),
+            'published_ts': published_ts,
+            'type': 'hackernews',
+            'score': hit.get('points', 0),
+            'hn_id': hit.get('objectID'),
+        }
+
+
+class _WindowTooLarge(Exception):
+    """La fenêtre demandée ne tient pas dans une page Algolia"""
+
+
+@register("hackernews", "Hacker News")
+async def fetch_hackernews(window: Window, queries: List[str] = None, min_points: int = None) -> List[Dict]:
+    queries = config.HACKERNEWS_QUERIES if queries is None else queries
+    return await in_thread(
+        HackerNewsFetcher().fetch_all, queries, window.days_back,
+        since_ts=window.since_ts, min_points=min_points,
+    )
@@ -0,0 +1,126 @@
+"""
+Cache de validateurs HTTP (ETag / Last-Modified) pour les feeds RSS/Atom.
+On envoie If-None-Match / If-Modified-Since ; sur un 304 on rejoue les
+entrées parsées au run précédent : ni téléchargement, ni parsing.
+"""
+import threading
+from typing import List, Dict, Optional
+
+from sources import timestamps
+from state_store import JsonStore
+
+
+class ConditionalCache:
+    def __init__(self, name: str = "http_cache"):
+        self.store = JsonStore(name)
+        self._stats_lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0, "bytes_saved": 0, "parse_saved": 0.0}
+
+    def conditional_headers(self, url: str, cutoff: Optional[float] = None) -> Dict[str, str]:
+        """
+        Validateurs à envoyer pour `url`. Vide si le cache ne peut pas
+        rejouer la fenêtre demandée (ex : run hebdo après un run quotidien).
+        """
+        if not self.covers(url, cutoff):
+            return {}
+        with self.store.lock:
+            record = self.store.data[url]
+
+        headers = {}
+        if record.get("etag"):
+            headers["If-None-Match"] = record["etag"]
+        if record.get("last_modified"):
+            headers["If-Modified-Since"] = record["last_modified"]
+        return headers
+
+    def covers(self, url: str, cutoff: Optional[float] = None) -> bool:
+        """Le dernier 200 mémorisé pour `url` couvre-t-il la fenêtre depuis `cutoff` ?"""
+        with self.store.lock:
+            record = self.store.data.get(url)
+        if not record:
+            return False
+        cached_cutoff = record.get("cutoff")
+        return cached_cutoff is None or (cutoff is not None and cutoff >= cached_cutoff)
+
+    def entries(self, url: str, cutoff: Optional[float] = None) -> List[Dict]:
+        """Entrées du dernier 200 pour `url`, refiltrées sur `cutoff`"""
+        with self.store.lock:
+            record = self.store.data.get(url, {})
+            entries = [dict(e) for e in record.get("entries", [])]
+        if cutoff is None:
+            return entries
+        return [e for e in entries if not self._is_older(e, cutoff)]
+
+    def restore_raw(self, items: List[Dict]):
+        """Remet le `summary_html` des items qui l'ont perdu (stores sans HTML brut)"""
+        missing = {item.get('link') for item in items if 'summary_html' not in item}
+        missing.discard(None)
+        if not missing:
+            return
+        raw_by_link = {}
+        with self.store.lock:
+            for record in self.store.data.values():
+                for entry in record.get("entries", []):
+                    if entry.get('link') in missing and entry.get('summary_html'):
+                        raw_by_link[entry['link']] = entry['summary_html']
+        for item in items:
+            if 'summary_html' not in item and item.get('link') in raw_by_link:
+                item['summary_html'] = raw_by_link[item['link']]
+
+    def replay(self, url: str, cutoff: Optional[float] = None) -> List[Dict]:
+        """Entrées du dernier 200 pour `url` après un 304"""
+        with self.store.lock:
+            record = self.store.data.get(url, {})
+
+        with self._stats_lock:
+            self.stats["hits"] += 1
+            self.stats["bytes_saved"] += record.get("size", 0)
+            self.stats["parse_saved"] += record.get("parse_time", 0.0)
+
+        return self.entries(url, cutoff)
+
+    def store_response(
+        self, url: str, resp, entries: List[Dict], parse_time: float,
+        cutoff: Optional[float] = None,
+    ):
+        """
+        Mémorise validateurs + entrées parsées d'une réponse 200. Gardé aussi
+        sans validateurs : les entrées servent au polling adaptatif.
+        """
+        with self._stats_lock:
+            self.stats["misses"] += 1
+
+        etag = resp.headers.get("ETag")
+        last_modified = resp.headers.get("Last-Modified")
+
+        with self.store.lock:
+            self.store.data[url] = {
+                "etag": etag,
+                "last_modified": last_modified,
+                "cutoff": cutoff,
+                "size": len(resp.content),
+                "parse_time": round(parse_time, 4),
+                # Copies : le pipeline modifie ensuite ses items (tags, résumé, ai_title)
+                "entries": [dict(e) for e in entries],
+            }
+            self.store.mark_dirty()
+
+    def report(self) -> str:
+        s = self.stats
+        total = s["hits"] + s["misses"]
+        if not total:
+            return "🗄️  Cache HTTP : aucune requête"
+        rate = s["hits"] / total * 100
+        return (
+            f"🗄️  Cache HTTP : {s['hits']}/{total} feeds inchangés ({rate:.0f}%) — "
+            f"{s['bytes_saved'] / 1024:.0f} Ko et {s['parse_saved']:.2f}s de parsing économisés"
+        )
+
+    @staticmethod
+    def _is_older(entry: Dict, cutoff: float) -> bool:
+        published_ts = timestamps.item_ts(entry)
+        return published_ts is not None and published_ts < cutoff
+
+
+# Instance partagée par tous les fetchers
+http_cache = ConditionalCache()
@@ -0,0 +1,67 @@
+"""
+Pool de processus pour le parsing CPU (feeds RSS, pages GitHub Trending).
+Le téléchargement reste en async / threads ; les octets bruts partent dans
+un worker et seuls les petits dicts d'entrées reviennent. Hors du GIL, les
+feeds d'un run sont parsés en vrai parallèle.
+
+Avec PARSE_WORKERS = 0 (défaut) les mêmes fonctions tournent dans le
+processus principal. Le gain dépend des cœurs disponibles et du nombre de
+feeds réellement re-parsés (les 304 ne coûtent rien) face au démarrage des
+workers et au pickling : à mesurer avec benchmark_parse.py. Les fonctions
+envoyées sont au niveau module et sans état partagé : index des entrées
+vues et cache HTTP restent côté processus principal.
+"""
+import asyncio
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Optional
+
+import config
+
+_workers = config.PARSE_WORKERS
+_pool: Optional[ProcessPoolExecutor] = None
+_lock = threading.Lock()
+
+
+def configure(workers: int):
+    """Nombre de workers (0 = parsing dans le processus principal)"""
+    global _workers
+    shutdown()
+    _workers = max(0, workers)
+
+
+def _get_pool() -> Optional[ProcessPoolExecutor]:
+    global _pool
+    with _lock:
+        if _pool is None and _workers > 0:
+            # forkserver/spawn : pas de fork d'un processus qui a déjà des threads (verrous)
+            methods = multiprocessing.get_all_start_methods()
+            context = multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+            _pool = ProcessPoolExecutor(max_workers=_workers, mp_context=context)
+        return _pool
+
+
+def run(fn: Callable, *args):
+    """fn(*args) dans un worker (appel bloquant, depuis un thread)"""
+    pool = _get_pool()
+    if pool is None:
+        return fn(*args)
+    return pool.submit(fn, *args).result()
+
+
+async def run_async(fn: Callable, *args):
+    """fn(*args) dans un worker, sans bloquer la boucle asyncio"""
+    pool = _get_pool()
+    if pool is None:
+        return fn(*args)
+    return await asyncio.get_running_loop().run_in_executor(pool, fn, *args)
+
+
+def shutdown():
+    """Arrête les workers (recréés au prochain appel si besoin)"""
+    global _pool
+    with _lock:
+        if _pool is not None:
+            _pool.shutdown()
+            _pool = None
@@ -0,0 +1,89 @@
+"""
+Polling adaptatif des feeds RSS.
+On garde, par feed, les dates de publication observées et on en déduit son
+rythme : un média qui poste toutes les heures est re-fetché à chaque run,
+un blog qui poste deux fois par mois ne l'est que tous les quelques jours.
+Entre deux fetchs, ses entrées sont servies par le cache HTTP (même fenêtre).
+Au fetch suivant, la fenêtre du feed remonte à son dernier fetch : les posts
+publiés pendant qu'il était sauté arrivent avec du retard, mais ne sont pas
+perdus. Les labs (catégorie + priority_boost) restent frais pour les alertes.
+"""
+import time
+from typing import List, Optional
+
+from state_store import JsonStore
+
+POLL_MIN = 30 * 60        # Jamais plus d'un fetch par feed toutes les 30 min
+POLL_MAX = 3 * 86400      # Feed très calme : re-vérifié au moins tous les 3 jours
+POLL_FRACTION = 0.5       # Re-fetch après la moitié de l'écart moyen entre 2 posts
+PRIORITY_SPEEDUP = 0.5    # priority_boost 2 → intervalle divisé par 2
+CATEGORY_MAX = {"labs": 2 * 3600}  # Plafond par catégorie (alertes toutes les 4h)
+DUE_SLACK = 10 * 60       # Tolérance sur l'heure des runs planifiés
+HISTORY_SIZE = 20         # Dates de publication gardées par feed
+CATCH_UP_OVERLAP = 15 * 60  # Posts datés juste avant le dernier fetch mais mis en ligne après
+
+
+class PollSchedule:
+    """
+    Format : {feed_url: {"since": ts, "last_fetch": ts, "posts": [ts, ...]}}
+    `since` = premier fetch, `posts` = dates de publication distinctes (récentes d'abord).
+    """
+
+    def __init__(self, name: str = "feed_schedule"):
+        self.store = JsonStore(name)
+
+    def record(self, url: str, published: List[Optional[int]], now: float = None):
+        """Fetch réussi de `url` : dates des entrées obtenues"""
+        now = now or time.time()
+        with self.store.lock:
+            rec = self.store.data.setdefault(url, {"since": int(now), "posts": []})
+            posts = set(rec["posts"]) | {int(ts) for ts in published if ts}
+            rec["posts"] = sorted(posts, reverse=True)[:HISTORY_SIZE]
+            rec["last_fetch"] = int(now)
+            self.store.mark_dirty()
+
+    def interval(self, url: str, category: str = "", priority_boost: int = 0, now: float = None) -> float:
+        """Délai entre deux fetchs de `url` d'après son rythme de publication"""
+        now = now or time.time()
+        with self.store.lock:
+            rec = self.store.data.get(url)
+            if not rec:
+                return POLL_MIN
+            posts = list(rec["posts"])
+            since = rec["since"]
+
+        # Période observée : depuis le 1er fetch, ou depuis le plus vieux post connu
+        start = posts[-1] if len(posts) >= HISTORY_SIZE else min([since] + posts[-1:])
+        # +1 : un post "à venir", pour ne pas espacer à l'infini un feed encore jamais vu poster
+        mean_gap = max(now - start, 0) / (len(posts) + 1)
+        interval = mean_gap * POLL_FRACTION / (1 + max(priority_boost, 0) * PRIORITY_SPEEDUP)
+        return min(max(interval, POLL_MIN), CATEGORY_MAX.get(category, POLL_MAX))
+
+    def is_due(self, url: str, category: str = "", priority_boost: int = 0, now: float = None) -> bool:
+        now = now or time.time()
+        with self.store.lock:
+            last_fetch = self.store.data.get(url, {}).get("last_fetch")
+        if last_fetch is None:
+            return True
+        return now + DUE_SLACK >= last_fetch + self.interval(url, category, priority_boost, now)
+
+    def catch_up_cutoff(self, url: str, cutoff_ts: float) -> float:
+        """Début de fenêtre pour fetcher `url` : remonte à son dernier fetch s'il a été sauté depuis"""
+        with self.store.lock:
+            last_fetch = self.store.data.get(url, {}).get("last_fetch")
+        if last_fetch is None:
+            return cutoff_ts
+        # Au-delà de POLL_MAX, le trou ne vient pas du polling adaptatif (feed en échec...)
+        return min(cutoff_ts, max(last_fetch - CATCH_UP_OVERLAP, cutoff_ts - POLL_MAX))
+
+    def next_due(self, url: str, category: str = "", priority_boost: int = 0) -> Optional[float]:
+        """Prochain fetch prévu (None = dès le prochain run)"""
+        with self.store.lock:
+            last_fetch = self.store.data.get(url, {}).get("last_fetch")
+        if last_fetch is None:
+            return None
+        return last_fetch + self.interval(url, category, priority_boost)
+
+
+# Instance partagée (bot quotidien + alertes)
+poll_schedule = PollSchedule()
@@ -2,129 +2,315 @@
 AliDonerBot — Fetch AI discussions from Reddit
 Utilise les flux RSS publics (plus fiable que le JSON API qui bloque)
 """
+import re
+import random
 import requests
-import feedparser
-from datetime import datetime, timedelta
-from typing import List, Dict, Tuple
+import http_client
+from typing import Any, Callable, List, Dict, Optional, Tuple
 import time
-from dateutil import parser as date_parser
+
+import config
+from sources import feed_parser, timestamps
+from sources.http_cache import http_cache
+from sources.registry import Window, in_thread, register
+from state_store import JsonStore
+
+# Mémoire des endpoints (www RSS / old RSS / JSON) par subreddit : le dernier
+# qui a marché passe en premier, les autres sont re-testés de temps en temps.
+ENDPOINT_RETEST = 0.1      # Probabilité de re-tester l'ordre par défaut
+ENDPOINT_RATE_ALPHA = 0.3  # Poids du dernier essai dans le taux de succès
+
+# {subreddit ou "A+B+C": {"last_ok": endpoint, "endpoints": {endpoint: {"rate", "tries"}}}}
+_endpoints = JsonStore("reddit_endpoints")
+
+_SUBREDDIT_RE = re.compile(r'/r/([^/]+)/')
+_LIMIT_RE = re.compile(r'limit=(\d+)')
 
 
 class RedditFetcher:
-    def __init__(self):
+    def __init__(self, combined: bool = True):
         self.headers = {
             'User-Agent': 'AliDonerBot/1.0 (AI News Monitoring)',
         }
+        # Un seul appel r/A+B+C pour tous les subreddits (repli individuel si besoin)
+        self.combined = combined
 
     def fetch_subreddit(self, subreddit: str, url: str) -> List[Dict]:
-        """Fetch hot posts via RSS feed (plus fiable que JSON API)"""
-        try:
-            # RSS endpoint (souvent pas bloqué contrairement au JSON)
-            rss_url = f"https://www.reddit.com/r/{subreddit}/hot/.rss?limit=15"
-
-            resp = requests.get(rss_url, headers=self.headers, timeout=8)
-
-            if resp.status_code != 200:
-                # Fallback: essayer old.reddit
-                rss_url = f"https://old.reddit.com/r/{subreddit}/hot/.rss?limit=15"
-                resp = requests.get(rss_url, headers=self.headers, timeout=8)
-
-            if resp.status_code != 200:
-                # Dernier fallback: JSON API
-                return self._fetch_json(subreddit, url)
-
-            feed = feedparser.parse(resp.text)
-            if not feed.entries:
-                return self._fetch_json(subreddit, url)
-
-            entries = []
-            for entry in feed.entries[:10]:
-                title = entry.get('title', '').strip()
-                link = entry.get('link', '')
-
-                if not title:
-                    continue
-
-                # Parse date
-                published = None
-                if hasattr(entry, 'updated_parsed') and entry.updated_parsed:
-                    try:
-                        published = datetime.fromtimestamp(time.mktime(entry.updated_parsed))
-                    except Exception:
-                        pass
-
-                summary = entry.get('summary', '')[:200] if entry.get('summary') else ''
-
-                entries.append({
-                    'source': f'r/{subreddit}',
-                    'title': title,
-                    'link': link,
-                    'summary': summary,
-                    'published': published.isoformat() if published else None,
-                    'type': 'reddit',
-                    'score': 0,
-                })
-
-            time.sleep(0.3)
-            return entries
-
-        except Exception as e:
-            print(f"    ✗ Error fetching r/{subreddit}: {e}")
-            return []
-
-    def _fetch_json(self, subreddit: str, url: str) -> List[Dict]:
-        """Fallback: fetch via JSON API"""
-        try:
-            resp = requests.get(url, headers=self.headers, timeout=8)
-            if resp.status_code != 200:
-                return []
-
-            data = resp.json()
-            posts = data.get('data', {}).get('children', [])
-
-            entries = []
-            for post in posts:
-                pdata = post.get('data', {})
-
-                if pdata.get('stickied'):
-                    continue
-
-                title = pdata.get('title', '')
-                url_post = pdata.get('url', '')
-                permalink = f"https://reddit.com{pdata.get('permalink', '')}"
-                score = pdata.get('score', 0)
-                comments = pdata.get('num_comments', 0)
-                created_utc = pdata.get('created_utc', 0)
-
-                if score < 10 and comments < 5:
-                    continue
-
-                published = datetime.fromtimestamp(created_utc)
-
-                entries.append({
-                    'source': f'r/{subreddit}',
-                    'title': title,
-                    'link': url_post if not url_post.startswith('/r/') else permalink,
-                    'summary': f"{score} upvotes, {comments} comments | {pdata.get('selftext', '')[:200]}",
-                    'published': published.isoformat(),
-                    'type': 'reddit',
-                    'score': score,
-                })
-
-            return entries
-
-        except Exception:
-            return []
-
-    def fetch_all(self, sources: List[Tuple[str, str, str]]) -> List[Dict]:
-        """Fetch from multiple subreddits"""
+        """Fetch hot posts — RSS www, RSS old, puis JSON (endpoint gagnant en premier)"""
+        attempts = {
+            "www": lambda: self._rss_attempt(
+                f"https://www.reddit.com/r/{subreddit}/hot/.rss?limit=15", subreddit),
+            "old": lambda: self._rss_attempt(
+                f"https://old.reddit.com/r/{subreddit}/hot/.rss?limit=15", subreddit),
+            "json": lambda: self._fetch_json(subreddit, url),
+        }
+        entries = self._first_working(subreddit, attempts)
+        return entries if entries is not None else []
+
+    def _rss_attempt(self, rss_url: str, subreddit: str) -> Optional[List[Dict]]:
+        """Un flux RSS individuel ; None si l'endpoint n'a rien donné"""
+        resp = self._get_rss(rss_url)
+
+        if resp.status_code == 304:
+            # Feed inchangé depuis le dernier run : on rejoue le cache
+            return http_cache.replay(rss_url)
+
+        if resp.status_code != 200:
+            return None
+
+        start = time.perf_counter()
+        feed = feed_parser.parse(resp.content, limit=10)
+        if not feed.entries:
+            return None
+
+        entries = self._rss_entries(feed.entries[:10], subreddit)
+
+        http_cache.store_response(rss_url, resp, entries, time.perf_counter() - start)
+        return entries
+
+    def _get_rss(self, rss_url: str) -> requests.Response:
+        """GET conditionnel d'un flux RSS reddit"""
+        headers = {**self.headers, **http_cache.conditional_headers(rss_url)}
+        return http_client.get(rss_url, headers=headers, timeout=8, source="reddit")
+
+    # ──────────────────────────────────────
+    # Parsing commun (flux individuel ou combiné)
+    # ──────────────────────────────────────
+
+    @staticmethod
+    def _rss_entries(feed_entries: list, subreddit: str) -> List[Dict]:
+        entries = []
+        for entry in feed_entries:
+            title = entry.get('title', '').strip()
+            link = entry.get('link', '')
+
+            if not title:
+                continue
+
+            published_ts = timestamps.entry_ts(entry)
+            summary = entry.get('summary', '')[:200] if entry.get('summary') else ''
+
+            entries.append({
+                'source': f'r/{subreddit}',
+                'title': title,
+                'link': link,
+                'summary': summary,
+                'published': timestamps.to_iso(published_ts),
+                'published_ts': published_ts,
+                'type': 'reddit',
+                'score': 0,
+            })
+        return entries
+
+    @staticmethod
+    def _json_entries(posts: list, subreddit: str) -> List[Dict]:
+        entries = []
+        for post in posts:
+            pdata = post.get('data', {})
+
+            if pdata.get('stickied'):
+                continue
+
+            title = pdata.get('title', '')
+            url_post = pdata.get('url', '')
+            permalink = f"https://reddit.com{pdata.get('permalink', '')}"
+            score = pdata.get('score', 0)
+            comments = pdata.get('num_comments', 0)
+            created_utc = pdata.get('created_utc', 0)
+
+            if score < 10 and comments < 5:
+                continue
+
+            published_ts = int(created_utc)
+
+            entries.append({
+                'source': f'r/{subreddit}',
+                'title': title,
+                'link': url_post if not url_post.startswith('/r/') else permalink,
+                'summary': f"{score} upvotes, {comments} comments | {pdata.get('selftext', '')[:200]}",
+                'published': timestamps.to_iso(published_ts),
+                'published_ts': published_ts,
+                'type': 'reddit',
+                'score': score,
+            })
+        return entries
+
+    @staticmethod
+    def _rss_subreddit(entry) -> str:
+        """Subreddit d'une entrée du flux combiné (catégorie Atom, sinon lien)"""
+        tags = entry.get('tags') or []
+        if tags and tags[0].get('term'):
+            return tags[0]['term']
+        match = _SUBREDDIT_RE.search(entry.get('link', ''))
+        return match.group(1) if match else ''
+
+    @staticmethod
+    def _group_by_subreddit(items: list, names: List[str], get_name) -> Dict[str, list]:
+        canonical = {name.lower(): name for name in names}
+        grouped: Dict[str, list] = {}
+        for item in items:
+            name = canonical.get(get_name(item).lower())
+            if name:
+                grouped.setdefault(name, []).append(item)
+        return grouped
+
+    @staticmethod
+    def _limit(url: str) -> int:
+        match = _LIMIT_RE.search(url)
+        return int(match.group(1)) if match else 10
+
+    def _fetch_json(self, subreddit: str, url: str) -> Optional[List[Dict]]:
+        """Fallback: fetch via JSON API (None si l'endpoint ne répond pas)"""
+        resp = http_client.get(url, headers=self.headers, timeout=8, source="reddit")
+        if resp.status_code != 200:
+            return None
+
+        data = resp.json()
+        posts = data.get('data', {}).get('children', [])
+
+        return self._json_entries(posts, subreddit)
+
+    def fetch_combined(self, sources: List[Tuple[str, str, str]]) -> Dict[str, List[Dict]]:
+        """
+        Tous les subreddits en un appel (r/A+B+C/hot), re-découpé par
+        subreddit avec la même limite top-N que le fetch individuel.
+
+        Returns:
+            {subreddit: entries} — un subreddit absent du flux combiné
+            (noyé par les gros subs) n'a pas de clé.
+        """
+        names = [name for name, _, _ in sources]
+        multi = "+".join(names)
+        attempts = {
+            "www": lambda: self._combined_rss_attempt(
+                f"https://www.reddit.com/r/{multi}/hot/.rss?limit=100", names),
+            "old": lambda: self._combined_rss_attempt(
+                f"https://old.reddit.com/r/{multi}/hot/.rss?limit=100", names),
+            "json": lambda: self._combined_json_attempt(
+                f"https://www.reddit.com/r/{multi}/hot.json?limit=100", sources),
+        }
+        return self._first_working(multi, attempts) or {}
+
+    def _combined_rss_attempt(self, rss_url: str, names: List[str]) -> Optional[Dict[str, List[Dict]]]:
+        resp = self._get_rss(rss_url)
+
+        if resp.status_code == 304:
+            by_sub: Dict[str, List[Dict]] = {}
+            for entry in http_cache.replay(rss_url):
+                by_sub.setdefault(entry['source'][2:], []).append(entry)
+            return by_sub
+
+        if resp.status_code != 200:
+            return None
+
+        start = time.perf_counter()
+        feed = feed_parser.parse(resp.content)
+        grouped = self._group_by_subreddit(feed.entries, names, self._rss_subreddit)
+        by_sub = {}
+        all_entries = []
+        for name in names:
+            entries = self._rss_entries(grouped.get(name, [])[:10], name)
+            if entries:
+                by_sub[name] = entries
+                all_entries.extend(entries)
+        if not all_entries:
+            return None
+
+        http_cache.store_response(rss_url, resp, all_entries, time.perf_counter() - start)
+        return by_sub
+
+    def _combined_json_attempt(self, json_url: str,
+                               sources: List[Tuple[str, str, str]]) -> Optional[Dict[str, List[Dict]]]:
+        resp = http_client.get(json_url, headers=self.headers, timeout=8, source="reddit")
+        if resp.status_code != 200:
+            return None
+
+        posts = resp.json().get('data', {}).get('children', [])
+        grouped = self._group_by_subreddit(
+            posts, [name for name, _, _ in sources],
+            lambda post: post.get('data', {}).get('subreddit', ''),
+        )
+        by_sub = {}
+        for name, url, _ in sources:
+            entries = self._json_entries(grouped.get(name, [])[:self._limit(url)], name)
+            if entries:
+                by_sub[name] = entries
+        return by_sub
+
+    # ──────────────────────────────────────
+    # Mémoire des endpoints
+    # ──────────────────────────────────────
+
+    def _first_working(self, key: str, attempts: Dict[str, Callable[[], Any]]) -> Any:
+        """
+        Essaie les endpoints dans l'ordre appris pour `key` et renvoie le
+        premier résultat non-None. Chaque essai met à jour les stats.
+        """
+        error = None
+        for endpoint in self._endpoint_order(key, list(attempts)):
+            try:
+                result = attempts[endpoint]()
+            except Exception as e:
+                error = e
+                result = None
+            self._record_endpoint(key, endpoint, result is not None)
+            if result is not None:
+                return result
+
+        if error is not None:
+            print(f"    ✗ Error fetching r/{key}: {error}")
+        return None
+
+    @staticmethod
+    def _endpoint_order(key: str, default: List[str]) -> List[str]:
+        """
+        Dernier endpoint gagnant d'abord, puis les autres par taux de succès.
+        De temps en temps (ENDPOINT_RETEST) on garde l'ordre par défaut pour
+        re-tester les endpoints délaissés.
+        """
+        with _endpoints.lock:
+            stats = _endpoints.data.get(key)
+            if not stats or random.random() < ENDPOINT_RETEST:
+                return list(default)
+            rates = stats.get("endpoints", {})
+            order = sorted(default, key=lambda ep: -rates.get(ep, {}).get("rate", 1.0))
+            last_ok = stats.get("last_ok")
+            if last_ok in order:
+                order.remove(last_ok)
+                order.insert(0, last_ok)
+            return order
+
+    @staticmethod
+    def _record_endpoint(key: str, endpoint: str, ok: bool):
+        with _endpoints.lock:
+            stats = _endpoints.data.setdefault(key, {"endpoints": {}})
+            ep = stats["endpoints"].setdefault(endpoint, {"rate": 1.0, "tries": 0})
+            # Moyenne glissante : un endpoint qui revient remonte en quelques runs
+            ep["rate"] = round((1 - ENDPOINT_RATE_ALPHA) * ep["rate"] + ENDPOINT_RATE_ALPHA * ok, 3)
+            ep["tries"] += 1
+            if ok:
+                stats["last_ok"] = endpoint
+            _endpoints.mark_dirty()
+
+    def fetch_all(self, sources: List[Tuple[str, str, str]], since_ts: Optional[float] = None) -> List[Dict]:
+        """Fetch from multiple subreddits (posts publiés depuis `since_ts` s'il est donné)"""
         print("  📡 Fetching Reddit...")
         all_entries = []
 
+        combined = self.fetch_combined(sources) if self.combined else {}
+        missing = [name for name, _, _ in sources if name not in combined]
+        if self.combined:
+            print(f"    ✓ Flux combiné : {len(sources) - len(missing)}/{len(sources)} subreddits")
+
         for name, url, _ in sources:
-            entries = self.fetch_subreddit(name, url)
+            entries = combined.get(name)
+            if entries is None:
+                entries = self.fetch_subreddit(name, url)
             all_entries.extend(entries)
 
+        if since_ts is not None:
+            all_entries = timestamps.newer_than(all_entries, since_ts)
+
         # Déduplique
         seen_urls = set()
         unique_entries = []
@@ -137,3 +323,9 @@ class RedditFetcher:
         unique_entries.sort(key=lambda x: x.get('score', 0), reverse=True)
         print(f"    ✓ Got {len(unique_entries)} posts")
         return unique_entries[:20]
+
+
+@register("reddit", "Reddit", cost=len(config.REDDIT_SOURCES), cacheable=True)
+async def fetch_reddit(window: Window, sources: List[Tuple[str, str, str]] = None) -> List[Dict]:
+    sources = config.REDDIT_SOURCES if sources is None else sources
+    return await in_thread(RedditFetcher().fetch_all, sources, since_ts=window.since_ts)
@@ -0,0 +1,89 @@
+"""
+Registre des types de source.
+Chaque type (clé = config.Source.type) déclare sa coroutine de fetch et ses
+métadonnées : coût, politesse, cache, deadline. Le scheduler
+(sources/scheduler.py) lance alors n'importe quel sous-ensemble de sources
+pour n'importe quel point d'entrée (bot, alertes...). Une nouvelle source =
+un module qui appelle @register : concurrence, deadline, timing, politesse
+de ses requêtes HTTP (même sans `source=`), repli sur ses derniers items et
+sauvegarde de l'état viennent du scheduler, rien à toucher ailleurs.
+"""
+import asyncio
+import contextvars
+import functools
+import importlib
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Dict, List, Optional
+
+import config
+import http_client
+
+# Modules des sources livrées (importés pour qu'ils s'enregistrent)
+BUILTIN_MODULES = (
+    "sources.rss_fetcher",
+    "sources.hackernews",
+    "sources.reddit",
+    "sources.github_trending",
+    "sources.twitter_fetcher",
+)
+
+# Exécuteur des fetchs bloquants, fourni par le scheduler le temps d'un run
+_executor = contextvars.ContextVar("source_executor", default=None)
+
+
+@dataclass(frozen=True)
+class Window:
+    """Fenêtre de collecte commune à toutes les sources"""
+    days_back: int
+    since_ts: float  # Début exact (epoch), voir timestamps.window_start
+
+
+@dataclass
+class SourceType:
+    key: str        # config.Source.type, clé de config.RATE_LIMITS / SOURCE_DEADLINES
+    label: str
+    fetch: Callable[..., Awaitable[List[Dict]]]  # async fetch(window, **params)
+    cost: int = 1                      # Requêtes HTTP typiques par run : les plus chères partent en premier
+    rate_limit: Optional[Dict] = None  # Politesse par défaut (config.RATE_LIMITS prioritaire)
+    cacheable: bool = False            # Échec ou deadline dépassée : items du dernier run réussi
+    deadline: float = 60               # Secondes (config.SOURCE_DEADLINES prioritaire)
+
+    @property
+    def timeout(self) -> float:
+        return config.SOURCE_DEADLINES.get(self.key, self.deadline)
+
+
+SOURCE_TYPES: Dict[str, SourceType] = {}
+
+
+def register(
+    key: str, label: str, cost: int = 1, rate_limit: Optional[Dict] = None,
+    cacheable: bool = False, deadline: float = 60,
+):
+    """Décorateur : enregistre `fetch` comme coroutine du type de source `key`"""
+    def decorator(fetch):
+        SOURCE_TYPES[key] = SourceType(key, label, fetch, cost, rate_limit, cacheable, deadline)
+        if rate_limit and key not in config.RATE_LIMITS:
+            http_client.add_rate_limit(key, rate_limit)
+        return fetch
+    return decorator
+
+
+def get(key: str) -> SourceType:
+    load_builtin()
+    if key not in SOURCE_TYPES:
+        raise KeyError(f"Type de source inconnu : {key} (enregistrés : {', '.join(SOURCE_TYPES)})")
+    return SOURCE_TYPES[key]
+
+
+def load_builtin():
+    for module in BUILTIN_MODULES:
+        importlib.import_module(module)
+
+
+async def in_thread(fn: Callable, *args, **kwargs):
+    """Appel bloquant (fetcher synchrone) depuis une coroutine de fetch"""
+    loop = asyncio.get_running_loop()
+    # Contexte copié : le thread garde la source en cours (http_client.current_source)
+    call = functools.partial(contextvars.copy_context().run, fn, *args, **kwargs)
+    return await loop.run_in_executor(_executor.get(), call)
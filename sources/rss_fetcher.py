@@ -1,83 +1,257 @@
 """
 Fetch RSS feeds from AI blogs and news sources
 """
-import feedparser
-import html2text
-from datetime import datetime, timedelta
-from typing import List, Dict, Optional
-from dateutil import parser as date_parser
+import asyncio
+import requests
+import http_client
+from collections import defaultdict
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import List, Dict, Optional, Tuple
+from urllib.parse import urlparse
 import time
 
+import config
+from sources import feed_parser, parse_pool, timestamps
+from sources.http_cache import http_cache
+from sources.poll_schedule import poll_schedule
+from sources.registry import Window, in_thread, register
+from sources.seen_index import seen_index
+from sources.summaries import RAW_MAX, lazy_fields, without_raw
+
+USER_AGENT = 'Mozilla/5.0 (AliDonerBot/1.0; +https://t.me/Alidoner75015Bot)'
+MAX_ENTRIES = 20  # Entrées gardées par feed (les plus récentes)
+
+
+@dataclass
+class FeedResult:
+    """Résultat du fetch d'un feed (succès ou échec) pour le reporting"""
+    name: str
+    url: str
+    entries: List[Dict] = field(default_factory=list)
+    ok: bool = True
+    error: str = ''
+    elapsed: float = 0.0
+    skipped: bool = False  # Pas dû (polling adaptatif) : entrées servies par le cache
+
+
 class RSSFetcher:
     def __init__(self):
-        self.html_converter = html2text.HTML2Text()
-        self.html_converter.ignore_links = False
-        self.html_converter.ignore_images = True
+        self.headers = {'User-Agent': USER_AGENT}
 
-    def fetch_feed(self, source_name: str, url: str, days_back: int = 2) -> List[Dict]:
+    def fetch_feed(
+        self, source_name: str, url: str, days_back: int = 2, since_ts: Optional[float] = None,
+    ) -> List[Dict]:
         """Fetch and parse a single RSS feed"""
         try:
             print(f"  📡 Fetching {source_name}...")
-            feed = feedparser.parse(url)
+            cutoff_date = datetime.fromtimestamp(timestamps.window_start(days_back, since_ts))
+            resp = self._download(url, cutoff_date)
+            entries = self._entries_from_response(source_name, url, resp, cutoff_date)
 
-            if feed.bozo and hasattr(feed, 'bozo_exception'):
-                print(f"    ⚠️  Warning: {feed.bozo_exception}")
+            print(f"    ✓ Got {len(entries)} recent entries")
+            return entries
 
-            entries = []
-            cutoff_date = datetime.now() - timedelta(days=days_back)
+        except Exception as e:
+            print(f"    ✗ Error fetching {source_name}: {e}")
+            return []
 
-            for entry in feed.entries[:20]:  # Limit to 20 most recent
-                # Parse date
-                published = self._get_date(entry)
-                if published and published < cutoff_date:
-                    continue  # Skip old entries
+    def fetch_feeds(
+        self,
+        sources: list,
+        days_back: int = 2,
+        max_concurrency: int = 10,
+        per_host: int = 2,
+        since_ts: Optional[float] = None,
+        adaptive: bool = False,
+    ) -> List[FeedResult]:
+        """
+        Fetch many feeds concurrently (asyncio).
 
-                # Extract content
-                title = entry.get('title', '').strip()
-                link = entry.get('link', '')
-                summary = self._get_summary(entry)
+        Args:
+            sources: objets avec `.name` et `.url` (config.Source)
+            since_ts: début exact de la fenêtre (epoch), prioritaire sur days_back
+            max_concurrency: connexions simultanées au total
+            per_host: connexions simultanées par hôte
+            adaptive: sauter les feeds pas encore dus (voir poll_schedule.py)
 
-                if not title or not link:
-                    continue
+        Returns:
+            Un FeedResult par source, dans l'ordre de `sources`
+        """
+        print(f"  📡 Fetching {len(sources)} RSS feeds ({max_concurrency} en parallèle)...")
+        cutoff_ts = timestamps.window_start(days_back, since_ts)
+        results = asyncio.run(
+            self._fetch_feeds_async(sources, cutoff_ts, max_concurrency, per_host, adaptive)
+        )
 
-                entries.append({
-                    'source': source_name,
-                    'title': title,
-                    'link': link,
-                    'summary': summary[:500] if summary else '',
-                    'published': published.isoformat() if published else None,
-                    'type': 'rss',
-                })
+        for r in results:
+            if r.skipped:
+                print(f"    ⏭️  {r.name} : pas dû, {len(r.entries)} entries du cache")
+            elif r.ok:
+                print(f"    ✓ {r.name} : {len(r.entries)} entries ({r.elapsed:.1f}s)")
+            else:
+                print(f"    ✗ {r.name} : {r.error}")
+        ok = sum(1 for r in results if r.ok)
+        skipped = sum(1 for r in results if r.skipped)
+        print(
+            f"    ✓ {ok}/{len(results)} feeds OK ({skipped} pas dus), "
+            f"{sum(len(r.entries) for r in results)} entries"
+        )
+        return results
 
-            print(f"    ✓ Got {len(entries)} recent entries")
-            time.sleep(0.2)  # Rate limiting (réduit pour la vitesse)
-            return entries
+    async def _fetch_feeds_async(
+        self, sources: list, cutoff_ts: float, max_concurrency: int, per_host: int,
+        adaptive: bool = False,
+    ) -> List[FeedResult]:
+        global_limit = asyncio.Semaphore(max_concurrency)
+        host_limits = defaultdict(lambda: asyncio.Semaphore(per_host))
 
-        except Exception as e:
-            print(f"    ✗ Error fetching {source_name}: {e}")
-            return []
+        async def fetch_one(source) -> FeedResult:
+            result = FeedResult(source.name, source.url)
+            feed_cutoff = cutoff_ts
+            if adaptive:
+                if self._can_skip(source, cutoff_ts):
+                    result.entries = http_cache.entries(source.url, cutoff_ts)
+                    result.skipped = True
+                    return result
+                # Feed sauté aux runs précédents : on rattrape depuis son dernier fetch
+                feed_cutoff = poll_schedule.catch_up_cutoff(source.url, cutoff_ts)
+
+            start = time.monotonic()
+            try:
+                host = urlparse(source.url).netloc
+                async with host_limits[host], global_limit:
+                    resp = await asyncio.to_thread(
+                        self._download, source.url, datetime.fromtimestamp(feed_cutoff),
+                    )
+                if resp.status_code == 304:
+                    result.entries = http_cache.replay(source.url, feed_cutoff)
+                else:
+                    # Parsing CPU dans le pool de processus (dans la boucle sans workers)
+                    parse_start = time.perf_counter()
+                    parsed = await parse_pool.run_async(
+                        extract_entries, resp.content, _feed_headers(resp), feed_cutoff,
+                    )
+                    result.entries = self._store_entries(
+                        source.name, source.url, resp, parsed, feed_cutoff, parse_start,
+                    )
+                poll_schedule.record(source.url, [timestamps.item_ts(e) for e in result.entries])
+            except Exception as e:
+                result.ok = False
+                result.error = str(e) or e.__class__.__name__
+            result.elapsed = time.monotonic() - start
+            return result
 
-    def _get_date(self, entry) -> Optional[datetime]:
-        """Extract date from entry"""
-        date_fields = ['published_parsed', 'updated_parsed', 'created_parsed', 'date_parsed']
+        return await asyncio.gather(*(fetch_one(s) for s in sources))
 
-        for field in date_fields:
-            if hasattr(entry, field) and getattr(entry, field):
-                struct_time = getattr(entry, field)
-                return datetime.fromtimestamp(time.mktime(struct_time))
+    @staticmethod
+    def _can_skip(source, cutoff_ts: float) -> bool:
+        """Feed pas encore dû, et dont le dernier fetch couvre la fenêtre demandée"""
+        due = poll_schedule.is_due(
+            source.url, getattr(source, 'category', ''), getattr(source, 'priority_boost', 0),
+        )
+        return not due and http_cache.covers(source.url, cutoff_ts)
 
-        # Try string dates
-        for field in ['published', 'updated', 'created', 'date']:
-            if hasattr(entry, field) and getattr(entry, field):
-                try:
-                    return date_parser.parse(getattr(entry, field))
-                except:
-                    pass
+    def _download(self, url: str, cutoff_date: datetime) -> requests.Response:
+        """GET conditionnel (ETag / Last-Modified) du feed brut"""
+        headers = {**self.headers, **http_cache.conditional_headers(url, cutoff_date.timestamp())}
+        resp = http_client.get(url, headers=headers, timeout=15, source="rss")
+        if resp.status_code != 304:
+            resp.raise_for_status()
+        return resp
 
-        return None
+    def _entries_from_response(
+        self, source_name: str, url: str, resp: requests.Response, cutoff_date: datetime,
+    ) -> List[Dict]:
+        """304 → entrées du cache ; 200 → parsing des bytes + mise en cache"""
+        cutoff_ts = cutoff_date.timestamp()
+        if resp.status_code == 304:
+            return http_cache.replay(url, cutoff_ts)
 
-    def _get_summary(self, entry) -> str:
-        """Extract clean summary from entry"""
+        start = time.perf_counter()
+        parsed = extract_entries(resp.content, _feed_headers(resp), cutoff_ts)
+        return self._store_entries(source_name, url, resp, parsed, cutoff_ts, start)
+
+    def _store_entries(
+        self, source_name: str, url: str, resp: requests.Response, parsed: tuple,
+        cutoff_ts: float, start: float,
+    ) -> List[Dict]:
+        """Entrées parsées → items, puis mise en cache HTTP de la réponse"""
+        entries = self._index_entries(source_name, url, parsed, cutoff_ts)
+        http_cache.store_response(url, resp, entries, time.perf_counter() - start, cutoff_ts)
+        return entries
+
+    def parse_feed(
+        self, source_name: str, url: str, content: bytes, cutoff_date: datetime,
+        headers: Optional[Dict] = None,
+    ) -> List[Dict]:
+        """Parse raw feed bytes into entry dicts"""
+        cutoff_ts = cutoff_date.timestamp()
+        parsed = extract_entries(content, headers or {'content-location': url}, cutoff_ts)
+        return self._index_entries(source_name, url, parsed, cutoff_ts)
+
+    def _index_entries(self, source_name: str, url: str, parsed: tuple, cutoff_ts: float) -> List[Dict]:
+        """
+        Sortie d'extract_entries → items. Les entrées déjà traitées à un run
+        précédent sont reprises de l'index (ni aperçu ni html2text).
+        """
+        records, warning = parsed
+        if warning:
+            print(f"    ⚠️  {source_name}: {warning}")
+
+        entries = []
+        last_ts = None
+        descending = True  # Flux trié du plus récent au plus ancien jusqu'ici
+        for record in records:
+            fps = record['fps']
+            seen = seen_index.lookup(url, fps)
+            if seen is not None:
+                published_ts, item = seen
+            else:
+                published_ts, item = record['published_ts'], None
+
+            if published_ts is not None:
+                descending = descending and (last_ts is None or published_ts <= last_ts)
+                last_ts = published_ts
+                if published_ts < cutoff_ts:
+                    if seen is None:
+                        # Item construit plus tard si une fenêtre plus large l'inclut (--days 7)
+                        seen_index.remember(url, fps, published_ts, None)
+                    if descending:
+                        break  # Les entrées suivantes sont plus vieilles encore
+                    continue  # Skip old entries
+
+            if item is not None:
+                if item:
+                    entry = dict(item, source=source_name)
+                    if record['raw_summary']:
+                        entry['summary_html'] = record['raw_summary']  # Pas gardé dans l'index
+                    entries.append(entry)
+                continue
+
+            title, link = record['title'], record['link']
+            if not title or not link:
+                seen_index.remember(url, fps, published_ts, {})
+                continue
+
+            item = {
+                'source': source_name,
+                'title': title,
+                'link': link,
+                **lazy_fields(record['raw_summary']),  # html2text différé (voir summaries.py)
+                'published': timestamps.to_iso(published_ts),
+                'published_ts': published_ts,
+                'type': 'rss',
+            }
+            # HTML brut gardé une seule fois, dans le cache HTTP (.cache/ part en CI)
+            seen_index.remember(url, fps, published_ts, without_raw(item))
+            entries.append(dict(item))
+
+        return entries
+
+    @staticmethod
+    def _get_raw_summary(entry) -> str:
+        """Extract raw (HTML) summary from entry"""
         content = ''
 
         # Try different content fields
@@ -91,12 +265,55 @@ class RSSFetcher:
             else:
                 content = str(entry.content)
 
-        # Convert HTML to text
-        if content:
-            try:
-                text = self.html_converter.handle(content)
-                return text.strip()
-            except:
-                return content.strip()
+        return content or ''
+
+
+def _feed_headers(resp: requests.Response) -> Dict[str, str]:
+    return {
+        'content-type': resp.headers.get('Content-Type', ''),
+        'content-location': resp.url,
+    }
+
+
+def extract_entries(content: bytes, headers: Dict, cutoff_ts: float) -> Tuple[List[Dict], Optional[str]]:
+    """
+    Partie CPU du parsing d'un feed, sans état partagé (exécutable dans un
+    worker de parse_pool) : un petit dict par entrée, HTML brut tronqué.
+
+    Returns:
+        (entrées, avertissement du parser ou None)
+    """
+    feed = feed_parser.parse(content, limit=MAX_ENTRIES, cutoff_ts=cutoff_ts, headers=headers)
+    warning = str(feed.bozo_exception) if feed.bozo and hasattr(feed, 'bozo_exception') else None
+    records = [
+        {
+            'fps': seen_index.fingerprints(entry),
+            'published_ts': timestamps.entry_ts(entry),  # Date normalisée une fois pour toutes
+            'title': entry.get('title', '').strip(),
+            'link': entry.get('link', ''),
+            # Seuls RAW_MAX caractères sont gardés dans l'item (summary_html)
+            'raw_summary': RSSFetcher._get_raw_summary(entry)[:RAW_MAX],
+        }
+        for entry in feed.entries[:MAX_ENTRIES]
+    ]
+    return records, warning
+
 
-        return ''
+@register("rss", "RSS Feeds", cost=len(config.RSS_SOURCES), cacheable=True)
+async def fetch_rss(window: Window, sources: list = None, adaptive: bool = None) -> List[Dict]:
+    """Feeds RSS de la fenêtre, tagués avec la catégorie et le boost de leur source"""
+    sources = config.RSS_SOURCES if sources is None else sources
+    results = await in_thread(
+        RSSFetcher().fetch_feeds, sources, window.days_back,
+        max_concurrency=config.RSS_MAX_CONCURRENCY,
+        per_host=config.RSS_PER_HOST_CONCURRENCY,
+        since_ts=window.since_ts,
+        adaptive=config.ADAPTIVE_POLLING if adaptive is None else adaptive,
+    )
+    items = []
+    for source, result in zip(sources, results):
+        for item in result.entries:
+            item['source_category'] = source.category
+            item['priority_boost'] = source.priority_boost
+        items.extend(result.entries)
+    return items
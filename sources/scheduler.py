@@ -0,0 +1,180 @@
+"""
+Scheduler de collecte commun à tous les points d'entrée.
+Lance un sous-ensemble de types de source (voir registry.py) : en
+parallèle, chacun avec sa deadline wall-clock, ou un par un. Les
+résultats arrivent dans le désordre mais sont fusionnés dans l'ordre
+demandé, pour que la sortie soit reproductible. L'état des fetchers
+(.cache/) est sauvegardé en fin de collecte, puis à la sortie du processus
+si une famille hors délai tournait encore.
+"""
+import asyncio
+import atexit
+import hashlib
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+import http_client
+from sources import registry, timestamps
+from sources.http_cache import http_cache
+from sources.registry import Window
+from sources.summaries import without_raw
+from state_store import JsonStore, save_all as save_fetch_state
+
+# Types `cacheable` : {clé[:params]: {"at": ts, "items": [...]}} du dernier run réussi
+_last_results = JsonStore("source_results")
+_save_at_exit = False
+
+
+@dataclass
+class SourceRun:
+    """Résultat d'un type de source pour le reporting"""
+    key: str
+    label: str
+    items: List[Dict] = field(default_factory=list)
+    ok: bool = True
+    error: str = ''
+    elapsed: float = 0.0
+    timed_out: bool = False
+
+
+def collect(
+    keys: List[str], window: Window, params: Optional[Dict[str, Dict]] = None, parallel: bool = True,
+) -> List[Dict]:
+    """
+    Fetch des types de source `keys` sur `window`, items fusionnés dans l'ordre de `keys`.
+
+    Args:
+        params: paramètres par type, ex : {"hackernews": {"queries": [...]}}
+        parallel: tous les types en même temps (sinon un par un, sans deadline)
+    """
+    runs = asyncio.run(collect_runs(keys, window, params or {}, parallel))
+    save_fetch_state()
+    if any(run.timed_out for run in runs):
+        _save_late_state()
+
+    items = []
+    for run in runs:
+        items.extend(run.items)
+    return items
+
+
+async def collect_runs(
+    keys: List[str], window: Window, params: Dict[str, Dict], parallel: bool,
+) -> List[SourceRun]:
+    types = [registry.get(key) for key in keys]
+    executor = ThreadPoolExecutor(max_workers=len(types) or 1, thread_name_prefix="collect")
+    token = registry._executor.set(executor)
+    try:
+        if parallel:
+            runs = await _run_parallel(types, window, params)
+        else:
+            runs = await _run_sequential(types, window, params)
+    finally:
+        registry._executor.reset(token)
+        # Fetchs hors délai : on ne les attend pas
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    for source, run in zip(types, runs):
+        if source.cacheable:
+            _use_last_results(run, window, params.get(source.key))
+    return runs
+
+
+async def _fetch(source, window: Window, params: Dict[str, Dict]) -> List[Dict]:
+    """Fetch d'un type : ses requêtes HTTP sans `source=` suivent sa politesse"""
+    token = http_client.current_source.set(source.key)
+    try:
+        return await source.fetch(window, **params.get(source.key, {}))
+    finally:
+        http_client.current_source.reset(token)
+
+
+def _use_last_results(run: SourceRun, window: Window, params: Optional[Dict]):
+    """Run réussi : items gardés ; échec / deadline : items du dernier run réussi"""
+    # Paramètres dans la clé : les alertes (labs seulement) n'écrasent pas le digest
+    key = run.key
+    if params:
+        key += ":" + hashlib.md5(repr(sorted(params.items())).encode()).hexdigest()[:8]
+
+    with _last_results.lock:
+        if run.ok:
+            _last_results.data[key] = {"at": int(time.time()), "items": [without_raw(i) for i in run.items]}
+            _last_results.mark_dirty()
+            return
+        stored = _last_results.data.get(key, {}).get("items", [])
+        run.items = timestamps.newer_than([dict(i) for i in stored], window.since_ts)
+    # HTML brut des résumés : gardé par le seul cache HTTP
+    http_cache.restore_raw(run.items)
+    if run.items:
+        print(f"   🗄️  {run.label} : {len(run.items)} items du dernier run réussi")
+
+
+def _save_late_state():
+    """
+    Les threads des familles hors délai sont joints à la sortie de Python
+    (concurrent.futures), avant les handlers atexit : leur état est sauvegardé là.
+    """
+    global _save_at_exit
+    if not _save_at_exit:
+        atexit.register(save_fetch_state)
+        _save_at_exit = True
+
+
+async def _run_sequential(types, window: Window, params: Dict[str, Dict]) -> List[SourceRun]:
+    runs = []
+    for i, source in enumerate(types, 1):
+        print(f"\n{i}. {source.label}...")
+        run = SourceRun(source.key, source.label)
+        start = time.monotonic()
+        try:
+            run.items = await _fetch(source, window, params)
+        except Exception as e:
+            run.ok, run.error = False, str(e) or e.__class__.__name__
+            print(f"   ✗ {source.label} : {run.error}")
+        run.elapsed = time.monotonic() - start
+        runs.append(run)
+    return runs
+
+
+async def _run_parallel(types, window: Window, params: Dict[str, Dict]) -> List[SourceRun]:
+    print(f"\n⚡ {len(types)} familles de sources en parallèle...")
+    start = time.monotonic()
+    runs = {source.key: SourceRun(source.key, source.label) for source in types}
+
+    # Les plus coûteuses démarrent en premier
+    tasks = {}
+    for source in sorted(types, key=lambda s: s.cost, reverse=True):
+        task = asyncio.create_task(_fetch(source, window, params))
+        tasks[task] = source
+    deadlines = {task: start + source.timeout for task, source in tasks.items()}
+    pending = set(tasks)
+
+    while pending:
+        timeout = max(0.0, min(deadlines[t] for t in pending) - time.monotonic())
+        done, pending = await asyncio.wait(pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+
+        for task in done:
+            source = tasks[task]
+            run = runs[source.key]
+            run.elapsed = time.monotonic() - start
+            try:
+                run.items = task.result()
+                print(f"   ✓ {source.label} : {len(run.items)} items ({run.elapsed:.1f}s)")
+            except Exception as e:
+                run.ok, run.error = False, str(e) or e.__class__.__name__
+                print(f"   ✗ {source.label} : {run.error}")
+
+        # Familles hors délai : on n'attend plus leurs résultats
+        now = time.monotonic()
+        for task in [t for t in pending if deadlines[t] <= now]:
+            source = tasks[task]
+            pending.discard(task)
+            task.cancel()
+            run = runs[source.key]
+            run.ok, run.timed_out, run.elapsed = False, True, now - start
+            print(f"   ⏱️  {source.label} : deadline de {source.timeout}s dépassée — ignoré")
+
+    print(f"   ⚡ Collecte terminée en {time.monotonic() - start:.1f}s")
+    return [runs[source.key] for source in types]
@@ -0,0 +1,97 @@
+"""
+Index persistant des entrées RSS déjà traitées, par feed.
+Une entrée est identifiée par l'empreinte de son GUID et de son lien ;
+si elle a déjà été vue, on saute date parsing + html2text et on réutilise
+le résultat du run précédent. Les empreintes expirent après TTL_DAYS
+sans être revues, pour que l'index reste petit.
+"""
+import time
+import hashlib
+from typing import Dict, List, Optional, Tuple
+
+from state_store import JsonStore
+
+TTL_DAYS = 14        # Empreinte oubliée si plus vue dans le feed depuis 14 jours
+KEEP_ITEM_DAYS = 8   # Item converti gardé tant qu'il peut entrer dans une fenêtre (hebdo = 7j)
+
+
+def _fp(value: str) -> str:
+    return hashlib.md5(value.encode("utf-8")).hexdigest()[:12]
+
+
+class SeenIndex:
+    """
+    Format : {feed_url: {guid_fp: [last_seen, published_ts, link_fp, item]}}
+    `item` vaut {} quand l'entrée ne produit rien (sans titre ni lien), None
+    quand elle n'a pas encore été convertie (hors fenêtre jusqu'ici, ou item
+    expiré) : elle l'est alors si une fenêtre plus large la couvre. Les items
+    sont gardés sans `summary_html`, repris du feed quand ils sont réutilisés.
+    """
+
+    def __init__(self, name: str = "seen_entries"):
+        self.store = JsonStore(name)
+        self._pruned = False
+        self._link_maps: Dict[str, Dict[str, str]] = {}
+
+    @staticmethod
+    def fingerprints(entry) -> Tuple[str, str]:
+        link = entry.get("link", "") or ""
+        guid = entry.get("id", "") or link
+        return _fp(guid), _fp(link)
+
+    def lookup(self, feed_url: str, fps: Tuple[str, str]) -> Optional[Tuple[Optional[float], Optional[Dict]]]:
+        """(published_ts, item) si l'entrée a déjà été traitée, sinon None"""
+        guid_fp, link_fp = fps
+        with self.store.lock:
+            feed = self._feed(feed_url)
+            key = guid_fp if guid_fp in feed else self._link_map(feed_url).get(link_fp)
+            if not key:
+                return None
+            record = feed[key]
+            record[0] = int(time.time())
+            self.store.mark_dirty()
+            return record[1], record[3]
+
+    def remember(
+        self, feed_url: str, fps: Tuple[str, str], published_ts: Optional[float], item: Optional[Dict],
+    ):
+        guid_fp, link_fp = fps
+        with self.store.lock:
+            feed = self._feed(feed_url)
+            feed[guid_fp] = [int(time.time()), published_ts, link_fp, item]
+            self._link_map(feed_url)[link_fp] = guid_fp
+            self.store.mark_dirty()
+
+    # ──────────────────────────────────────
+
+    def _feed(self, feed_url: str) -> Dict[str, List]:
+        if not self._pruned:
+            self._prune()
+        return self.store.data.setdefault(feed_url, {})
+
+    def _link_map(self, feed_url: str) -> Dict[str, str]:
+        if feed_url not in self._link_maps:
+            feed = self.store.data.get(feed_url, {})
+            self._link_maps[feed_url] = {rec[2]: key for key, rec in feed.items()}
+        return self._link_maps[feed_url]
+
+    def _prune(self):
+        """Expiration : empreintes plus vues depuis TTL_DAYS, items trop vieux"""
+        self._pruned = True
+        now = time.time()
+        seen_cutoff = now - TTL_DAYS * 86400
+        item_cutoff = now - KEEP_ITEM_DAYS * 86400
+        for feed_url in list(self.store.data):
+            feed = self.store.data[feed_url]
+            for key in list(feed):
+                last_seen, published_ts, _, item = feed[key]
+                if last_seen < seen_cutoff:
+                    del feed[key]
+                elif item and published_ts is not None and published_ts < item_cutoff:
+                    feed[key][3] = None
+            if not feed:
+                del self.store.data[feed_url]
+        self.store.mark_dirty()
+
+
+seen_index = SeenIndex()
@@ -0,0 +1,58 @@
+"""
+Résumés RSS paresseux.
+À la collecte, `summary` ne contient qu'un aperçu (balises retirées), assez
+pour le scoring par mots-clés et la déduplication ; le HTML brut est gardé
+dans `summary_html`. La conversion html2text n'est faite qu'à la première
+lecture par full_summary() (prompt LLM, message Telegram, alerte), donc
+seulement pour la poignée d'items réellement affichés.
+"""
+import html
+import re
+from typing import Dict
+
+import html2text
+
+SUMMARY_MAX = 500   # Longueur max du résumé (aperçu ou converti)
+RAW_MAX = 4000      # HTML brut gardé : largement de quoi produire 500 caractères
+
+_TAG_RE = re.compile(r'<[^>]+>')
+_SPACE_RE = re.compile(r'\s+')
+
+
+def preview(raw: str) -> str:
+    """Aperçu texte sans html2text : balises retirées, entités décodées"""
+    text = html.unescape(_TAG_RE.sub(' ', raw))
+    return _SPACE_RE.sub(' ', text).strip()[:SUMMARY_MAX]
+
+
+def to_text(raw: str) -> str:
+    """Conversion complète HTML → texte (markdown léger)"""
+    # Un convertisseur par appel : HTML2Text garde un état interne
+    converter = html2text.HTML2Text()
+    converter.ignore_links = False
+    converter.ignore_images = True
+    try:
+        return converter.handle(raw).strip()
+    except Exception:
+        return raw.strip()
+
+
+def lazy_fields(raw: str) -> Dict[str, str]:
+    """Champs résumé d'un item à la collecte"""
+    if not raw:
+        return {'summary': ''}
+    return {'summary': preview(raw), 'summary_html': raw[:RAW_MAX]}
+
+
+def without_raw(item: Dict) -> Dict:
+    """Copie de l'item sans `summary_html` (HTML brut stocké par le seul cache HTTP)"""
+    return {k: v for k, v in item.items() if k != 'summary_html'}
+
+
+def full_summary(item: Dict) -> str:
+    """Résumé converti de l'item (calculé une fois, puis mis en cache dans l'item)"""
+    raw = item.pop('summary_html', None)
+    if raw is not None:
+        text = to_text(raw)
+        item['summary'] = text[:SUMMARY_MAX] if text else ''
+    return item.get('summary', '')
@@ -0,0 +1,150 @@
+"""
+Dates des sources → timestamps epoch (int, secondes), calculés une seule fois
+à la collecte. Chaque item porte `published_ts` ; `published` (ISO) ne sert
+plus qu'à l'affichage et aux caches écrits avant ce champ. Le reste du
+pipeline (cutoffs, tri, boost récence) compare des entiers.
+
+RFC 822 (RSS, Nitter) et ISO 8601 (Atom, X API, nos propres items) ont un
+chemin rapide ; le reste passe par dateutil, mémoïsé.
+"""
+import calendar
+import re
+import time
+from datetime import datetime
+from functools import lru_cache
+from typing import Dict, List, Optional
+
+from dateutil import parser as date_parser
+
+# Champs date d'une entrée feedparser, par ordre de préférence
+_STRUCT_FIELDS = ('published_parsed', 'updated_parsed', 'created_parsed', 'date_parsed')
+_TEXT_FIELDS = ('published', 'updated', 'created', 'date')
+
+_RFC822_RE = re.compile(
+    r'(?:[A-Za-z]{3},?\s*)?(\d{1,2})\s+([A-Za-z]{3})[A-Za-z]*\.?\s+(\d{4}|\d{2})\s+'
+    r'(\d{1,2}):(\d{2})(?::(\d{2}))?\s*([A-Za-z]{1,3}|[+-]\d{2}:?\d{2})?$'
+)
+_MONTHS = {
+    m: i for i, m in enumerate(
+        ('jan', 'feb', 'mar', 'apr', 'may', 'jun', 'jul', 'aug', 'sep', 'oct', 'nov', 'dec'), 1,
+    )
+}
+# Fuseaux nommés de la RFC 822 (décalage en heures)
+_ZONES = {
+    'ut': 0, 'utc': 0, 'gmt': 0, 'z': 0,
+    'est': -5, 'edt': -4, 'cst': -6, 'cdt': -5, 'mst': -7, 'mdt': -6, 'pst': -8, 'pdt': -7,
+}
+
+
+def from_struct(value: time.struct_time) -> int:
+    """struct_time feedparser (toujours en UTC) → epoch"""
+    return calendar.timegm(value)
+
+
+def parse(value) -> Optional[int]:
+    """Date quelconque (texte, datetime, struct_time, epoch) → epoch, None si illisible"""
+    if value is None or isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        return int(value)
+    if isinstance(value, time.struct_time):
+        return from_struct(value)
+    if isinstance(value, datetime):
+        # datetime naïf = heure locale, comme datetime.now()
+        return int(value.timestamp())
+    if not isinstance(value, str):
+        return None
+    text = value.strip()
+    if not text:
+        return None
+    ts = _rfc822(text)
+    if ts is None:
+        ts = _iso(text)
+    if ts is None:
+        ts = _fallback(text)
+    return ts
+
+
+def _rfc822(text: str) -> Optional[int]:
+    match = _RFC822_RE.match(text)
+    if not match:
+        return None
+    day, month, year, hour, minute, second, zone = match.groups()
+    month_num = _MONTHS.get(month.lower())
+    if month_num is None:
+        return None
+    year_num = int(year)
+    if year_num < 100:
+        year_num += 2000 if year_num < 50 else 1900
+
+    offset = 0  # Sans fuseau : UTC, comme feedparser
+    if zone:
+        if zone[0] in '+-':
+            digits = zone[1:].replace(':', '')
+            offset = int(digits[:2]) * 3600 + int(digits[2:]) * 60
+            offset = -offset if zone[0] == '-' else offset
+        elif zone.lower() in _ZONES:
+            offset = _ZONES[zone.lower()] * 3600
+        else:
+            return None  # Fuseau inconnu : dateutil
+
+    try:
+        epoch = calendar.timegm((year_num, month_num, int(day), int(hour), int(minute), int(second or 0)))
+    except (ValueError, OverflowError):
+        return None
+    return epoch - offset
+
+
+def _iso(text: str) -> Optional[int]:
+    try:
+        # datetime naïf = heure locale (format de nos `published`)
+        return int(datetime.fromisoformat(text.replace('Z', '+00:00')).timestamp())
+    except (ValueError, OverflowError):
+        return None
+
+
+@lru_cache(maxsize=4096)
+def _fallback(text: str) -> Optional[int]:
+    try:
+        return int(date_parser.parse(text).timestamp())
+    except (ValueError, OverflowError):
+        return None
+
+
+def entry_ts(entry) -> Optional[int]:
+    """Date d'une entrée feedparser : struct_time déjà parsés, sinon le texte"""
+    for field in _STRUCT_FIELDS:
+        if entry.get(field):
+            return from_struct(entry[field])
+    for field in _TEXT_FIELDS:
+        if entry.get(field):
+            ts = parse(entry[field])
+            if ts is not None:
+                return ts
+    return None
+
+
+def item_ts(item: Dict) -> Optional[int]:
+    """`published_ts` d'un item, recalculé pour les items en cache qui ne l'ont pas"""
+    ts = item.get('published_ts')
+    return ts if ts is not None else parse(item.get('published'))
+
+
+def window_start(days_back: int, since_ts: Optional[float] = None) -> float:
+    """Début de la fenêtre de collecte : `since_ts` exact s'il est donné, sinon N jours"""
+    return since_ts if since_ts is not None else time.time() - days_back * 86400
+
+
+def newer_than(items: List[Dict], cutoff: float) -> List[Dict]:
+    """Items publiés depuis `cutoff` (les items sans date sont gardés)"""
+    kept = []
+    for item in items:
+        ts = item_ts(item)
+        if ts is None or ts >= cutoff:
+            kept.append(item)
+    return kept
+
+
+def to_iso(ts: Optional[int]) -> Optional[str]:
+    """Epoch → ISO en heure locale, pour l'affichage"""
+    return datetime.fromtimestamp(ts).isoformat() if ts is not None else None
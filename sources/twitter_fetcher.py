@@ -8,18 +8,25 @@ Stratégie :
 import os
 import re
 import requests
-import feedparser
+import http_client
 import time
 import hmac
 import hashlib
 import base64
 import urllib.parse
 import uuid
-from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime, timezone
 from typing import List, Dict, Optional
-from dateutil import parser as date_parser
 from dotenv import load_dotenv
 
+from reliability import CircuitOpenError
+from sources import feed_parser, timestamps
+from sources.http_cache import http_cache
+from sources.registry import Window, in_thread, register
+from sources.x_quota import x_quota
+from state_store import JsonStore
+
 load_dotenv(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", ".env"))
 
 # ═══ Nitter / bridges RSS ═══
@@ -37,6 +44,39 @@ RSSHUB_INSTANCES = [
     "https://rsshub.rssforever.com",
 ]
 
+# Santé des instances, gardée entre les runs :
+# {instance: {"rate", "latency", "tries", "last_ok", "last_probe"}}
+INSTANCE_PROBE_TIMEOUT = 5
+INSTANCE_RATE_ALPHA = 0.3       # Poids de la dernière sonde dans le taux de succès
+INSTANCE_TRUSTED_RATE = 0.8     # Au-dessus : la meilleure instance est testée seule
+INSTANCE_DEAD_RATE = 0.25       # En dessous : instance sautée...
+INSTANCE_RETRY_AFTER = 6 * 3600  # ... jusqu'à 6h après sa dernière sonde
+_health = JsonStore("twitter_instances")
+
+# Fetch des comptes : requêtes simultanées par instance, et nombre d'instances
+# de secours essayées pour les comptes en erreur
+INSTANCE_CONCURRENCY = 4
+RSS_FAILOVER_INSTANCES = 2
+
+# ═══ X API ═══
+# Les user_id ne changent pas : cache local {username: {"id", "ts"}}, résolu
+# par lots (100 usernames max par appel users/by) au lieu d'un appel par compte.
+USER_ID_TTL = 30 * 86400
+USERS_LOOKUP_BATCH = 100
+_user_ids = JsonStore("x_user_ids")
+
+# Timelines incrémentales : since_id par compte + tweets récents gardés
+# localement, la fenêtre demandée est reconstruite sans re-télécharger.
+# {"api": {user: {"since_id", "covered_from", "tweets"}},
+#  "rss": {user: {"newest": ts, "entries": [...]}}}
+TIMELINE_KEEP = 8 * 86400       # Fenêtre hebdo incluse
+TIMELINE_KEEP_TWEETS = 20
+_timelines = JsonStore("x_timelines")
+
+# Clés d'endpoint du quota (voir sources/x_quota.py)
+USERS_BY_ENDPOINT = "/2/users/by"
+TIMELINE_ENDPOINT = "/2/users/:id/tweets"
+
 # Comptes X à suivre — IA, tech, builders
 DEFAULT_ACCOUNTS = [
     # Tes favoris
@@ -60,6 +100,27 @@ DEFAULT_ACCOUNTS = [
 ]
 
 
+# Servis en premier quand le quota X API ne couvre pas tous les comptes
+PRIORITY_ACCOUNTS = ["sama", "OpenAI", "AnthropicAI"]
+
+
+def _tweet_ts(tweet: Dict) -> int:
+    return timestamps.parse(tweet.get("created_at")) or 0
+
+
+_FIRST_DATE_RE = re.compile(
+    rb'<(?:item|entry)\b.*?<(pubDate|published|updated)>([^<]+)</\1>', re.DOTALL,
+)
+
+
+def _first_entry_ts(content: bytes) -> Optional[int]:
+    """Date de la 1re entrée d'un flux RSS/Atom, sans parser tout le flux"""
+    match = _FIRST_DATE_RE.search(content)
+    if not match:
+        return None
+    return timestamps.parse(match.group(2).decode("utf-8", "replace"))
+
+
 class TwitterFetcher:
     def __init__(self, accounts: List[tuple] = None):
         self.accounts = accounts or DEFAULT_ACCOUNTS
@@ -77,28 +138,29 @@ class TwitterFetcher:
             self.access_token, self.access_token_secret,
         ])
 
-    def fetch_all(self, days_back: int = 2) -> List[Dict]:
-        """Fetch tweets, multi-stratégie"""
+    def fetch_all(self, days_back: int = 2, since_ts: Optional[float] = None) -> List[Dict]:
+        """Fetch tweets, multi-stratégie (depuis `since_ts` s'il est donné)"""
         print("  📡 Fetching X/Twitter...")
+        since_ts = timestamps.window_start(days_back, since_ts)
         entries = []
 
         # Stratégie 1 : X API v2 via OAuth 1.0a (nécessite Basic tier $100/mois)
         if self.use_api:
             print("    📍 Tentative X API v2 (OAuth 1.0a)...")
-            entries = self._fetch_via_api(days_back)
+            entries = self._fetch_via_api(since_ts)
             if entries:
                 print(f"    ✓ API : {len(entries)} tweets")
 
         # Stratégie 2 : Nitter RSS (public instances)
         if len(entries) < 3:
-            nitter_entries = self._fetch_via_nitter(days_back)
+            nitter_entries = self._fetch_via_nitter(since_ts)
             if nitter_entries:
                 print(f"    📍 Nitter : {len(nitter_entries)} tweets")
                 entries.extend(nitter_entries)
 
         # Stratégie 3 : RSSHub bridge
         if len(entries) < 3:
-            rsshub_entries = self._fetch_via_rsshub(days_back)
+            rsshub_entries = self._fetch_via_rsshub(since_ts)
             if rsshub_entries:
                 print(f"    📍 RSSHub : {len(rsshub_entries)} tweets")
                 entries.extend(rsshub_entries)
@@ -116,7 +178,7 @@ class TwitterFetcher:
                 seen_titles.add(key)
                 unique.append(e)
 
-        unique.sort(key=lambda x: x.get("published", ""), reverse=True)
+        unique.sort(key=lambda x: timestamps.item_ts(x) or 0, reverse=True)
         print(f"    ✓ {len(unique)} tweets uniques")
         return unique[:15]
 
@@ -124,76 +186,174 @@ class TwitterFetcher:
     # Méthode 1 : X API v2 via OAuth 1.0a
     # ──────────────────────────────────────
 
-    def _fetch_via_api(self, days_back: int) -> List[Dict]:
+    def _fetch_via_api(self, since_ts: float) -> List[Dict]:
         """Fetch via X API v2 avec signature OAuth 1.0a"""
         all_entries = []
 
-        for username, display_name in self.accounts:
+        user_ids = self._resolve_user_ids([username for username, _ in self.accounts])
+        if user_ids is None:
+            self._print_quota_stop(USERS_BY_ENDPOINT)
+            return []
+
+        # Budget timelines réparti par priorité : on n'envoie pas d'appel refusé d'avance
+        usernames = x_quota.allocate(
+            TIMELINE_ENDPOINT, [username for username, _ in self.accounts], PRIORITY_ACCOUNTS,
+        )
+        if len(usernames) < len(self.accounts):
+            self._print_quota_stop(TIMELINE_ENDPOINT, len(self.accounts) - len(usernames))
+
+        for username in usernames:
+            if not x_quota.can_spend(TIMELINE_ENDPOINT):
+                self._print_quota_stop(TIMELINE_ENDPOINT)
+                break
+            user_id = user_ids.get(username.lower())
+            if not user_id:
+                continue
             try:
-                # Récupérer le user_id
-                url = f"https://api.x.com/2/users/by/username/{username}"
-                resp = self._oauth_get(url)
-                if resp.status_code == 429:
-                    print("    ⚠️  Rate limit X API — arrêt")
-                    break
-                if resp.status_code != 200:
-                    continue
+                entries = self._fetch_timeline(username, user_id, since_ts)
+            except Exception:
+                continue
+            if entries is None:
+                self._print_quota_stop(TIMELINE_ENDPOINT)
+                break
+            all_entries.extend(entries)
 
-                user_id = resp.json().get("data", {}).get("id")
-                if not user_id:
-                    continue
+        print(f"    {x_quota.report()}")
+        return all_entries
 
-                # Récupérer les tweets récents
-                since = (datetime.utcnow() - timedelta(days=days_back)).strftime("%Y-%m-%dT%H:%M:%SZ")
-                tweets_url = f"https://api.x.com/2/users/{user_id}/tweets"
-                params = {
-                    "max_results": "5",
-                    "start_time": since,
-                    "tweet.fields": "created_at,public_metrics,text",
+    def _fetch_timeline(self, username: str, user_id: str, window_start: float) -> Optional[List[Dict]]:
+        """
+        Tweets récents d'un compte. Avec un since_id connu (et une couverture
+        suffisante), seuls les tweets plus récents sont demandés et fusionnés
+        avec ceux gardés localement. None si l'API répond 429.
+        """
+        key = username.lower()
+        with _timelines.lock:
+            state = _timelines.data.setdefault("api", {}).get(key)
+            incremental = bool(state and state.get("since_id") and state["covered_from"] <= window_start)
+
+        params = {
+            "max_results": "5",
+            "exclude": "retweets",
+            "tweet.fields": "created_at,public_metrics,text",
+        }
+        if incremental:
+            params["since_id"] = state["since_id"]
+        else:
+            params["start_time"] = datetime.fromtimestamp(window_start, timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+        resp = self._oauth_get(f"https://api.x.com/2/users/{user_id}/tweets", params)
+        if resp.status_code == 429:
+            return None
+
+        if resp.status_code == 200:
+            tweets = resp.json().get("data", [])
+            with _timelines.lock:
+                previous = state["tweets"] if incremental else []
+                merged = {t["id"]: t for t in previous + [self._slim_tweet(t) for t in tweets]}
+                keep_from = time.time() - TIMELINE_KEEP
+                kept = sorted(
+                    (t for t in merged.values() if _tweet_ts(t) >= keep_from),
+                    key=lambda t: int(t["id"]), reverse=True,
+                )[:TIMELINE_KEEP_TWEETS]
+                newest = max([int(t["id"]) for t in tweets] + [int(state["since_id"]) if incremental else 0])
+                _timelines.data["api"][key] = {
+                    "since_id": str(newest) if newest else None,
+                    "covered_from": max(state["covered_from"] if incremental else window_start, keep_from),
+                    "tweets": kept,
                 }
+                _timelines.mark_dirty()
+        elif not incremental:
+            return []
 
-                resp = self._oauth_get(tweets_url, params)
-                if resp.status_code == 429:
-                    print("    ⚠️  Rate limit X API — arrêt")
-                    break
-                if resp.status_code != 200:
-                    continue
+        with _timelines.lock:
+            stored = list(_timelines.data["api"].get(key, {}).get("tweets", []))
 
-                tweets = resp.json().get("data", [])
-                if not tweets:
-                    continue
+        # Mêmes règles qu'un appel complet : les 5 plus récents de la fenêtre
+        recent = [t for t in stored if _tweet_ts(t) >= window_start][:5]
+        return [e for e in (self._tweet_entry(username, t) for t in recent) if e]
+
+    @staticmethod
+    def _slim_tweet(tweet: Dict) -> Dict:
+        return {
+            "id": tweet.get("id", ""),
+            "text": tweet.get("text", ""),
+            "created_at": tweet.get("created_at", ""),
+            "public_metrics": tweet.get("public_metrics", {}),
+        }
 
-                for tweet in tweets:
-                    text = tweet.get("text", "")
-                    tweet_id = tweet.get("id", "")
-                    created = tweet.get("created_at", "")
-                    metrics = tweet.get("public_metrics", {})
-
-                    if text.startswith("RT @"):
-                        continue
-                    if len(text) < 30:
-                        continue
-
-                    title = self._clean_tweet_text(text)
-                    if len(title) > 140:
-                        title = title[:137] + "…"
-
-                    all_entries.append({
-                        "source": f"X: @{username}",
-                        "title": title,
-                        "link": f"https://x.com/{username}/status/{tweet_id}",
-                        "summary": text[:300],
-                        "published": created,
-                        "type": "twitter",
-                        "score": metrics.get("like_count", 0) + metrics.get("retweet_count", 0) * 3,
-                    })
-
-                time.sleep(0.3)
+    def _tweet_entry(self, username: str, tweet: Dict) -> Optional[Dict]:
+        text = tweet.get("text", "")
+        tweet_id = tweet.get("id", "")
+        created = tweet.get("created_at", "")
+        metrics = tweet.get("public_metrics", {})
+
+        if text.startswith("RT @"):
+            return None
+        if len(text) < 30:
+            return None
+
+        title = self._clean_tweet_text(text)
+        if len(title) > 140:
+            title = title[:137] + "…"
+
+        return {
+            "source": f"X: @{username}",
+            "title": title,
+            "link": f"https://x.com/{username}/status/{tweet_id}",
+            "summary": text[:300],
+            "published": created,
+            "published_ts": timestamps.parse(created),
+            "type": "twitter",
+            "score": metrics.get("like_count", 0) + metrics.get("retweet_count", 0) * 3,
+        }
 
+    @staticmethod
+    def _print_quota_stop(endpoint: str, skipped: int = 0):
+        reopens = x_quota.next_window(endpoint)
+        when = f" — prochaine fenêtre à {reopens:%H:%M}" if reopens else ""
+        what = f"{skipped} comptes reportés" if skipped else "arrêt"
+        print(f"    ⚠️  Quota X API ({endpoint}) : {what}{when}")
+
+    def _resolve_user_ids(self, usernames: List[str]) -> Optional[Dict[str, str]]:
+        """
+        username (minuscule) → user_id. Cache local longue durée, et un seul
+        appel groupé `users/by?usernames=...` pour les comptes inconnus.
+        None si l'API répond 429 (quota épuisé).
+        """
+        now = time.time()
+        with _user_ids.lock:
+            cached = {
+                name: record["id"]
+                for name, record in _user_ids.data.items()
+                if now - record.get("ts", 0) < USER_ID_TTL
+            }
+
+        missing = [u for u in usernames if u.lower() not in cached]
+        if missing and not x_quota.can_spend(USERS_BY_ENDPOINT):
+            return cached if cached else None
+        for start in range(0, len(missing), USERS_LOOKUP_BATCH):
+            batch = missing[start:start + USERS_LOOKUP_BATCH]
+            try:
+                resp = self._oauth_get(
+                    "https://api.x.com/2/users/by", {"usernames": ",".join(batch)},
+                )
             except Exception:
                 continue
+            if resp.status_code == 429:
+                return None
+            if resp.status_code != 200:
+                continue
 
-        return all_entries
+            with _user_ids.lock:
+                for user in resp.json().get("data", []):
+                    name = user.get("username", "").lower()
+                    if name and user.get("id"):
+                        cached[name] = user["id"]
+                        _user_ids.data[name] = {"id": user["id"], "ts": now}
+                _user_ids.mark_dirty()
+
+        return cached
 
     def _oauth_get(self, url: str, params: dict = None) -> requests.Response:
         """GET request avec signature OAuth 1.0a (HMAC-SHA1)"""
@@ -233,107 +393,240 @@ class TwitterFetcher:
         )
 
         headers = {"Authorization": auth_header}
-        return requests.get(url, params=params, headers=headers, timeout=10)
+        resp = http_client.get(
+            url, params=params, headers=headers, timeout=10, source="x_api",
+        )
+        x_quota.update(url, resp)
+        return resp
 
     # ──────────────────────────────────────
     # Méthode 2 : Nitter RSS
     # ──────────────────────────────────────
 
-    def _fetch_via_nitter(self, days_back: int) -> List[Dict]:
+    def _fetch_via_nitter(self, since_ts: float) -> List[Dict]:
         if not self._working_nitter:
             self._working_nitter = self._find_working_instance(
                 NITTER_INSTANCES, "/{username}/rss"
             )
         if not self._working_nitter:
             return []
-        return self._fetch_rss_entries(self._working_nitter, "/{username}/rss", days_back)
+        return self._fetch_rss_entries(
+            self._working_nitter, "/{username}/rss", since_ts, NITTER_INSTANCES,
+        )
 
     # ──────────────────────────────────────
     # Méthode 3 : RSSHub bridge
     # ──────────────────────────────────────
 
-    def _fetch_via_rsshub(self, days_back: int) -> List[Dict]:
+    def _fetch_via_rsshub(self, since_ts: float) -> List[Dict]:
         if not self._working_rsshub:
             self._working_rsshub = self._find_working_instance(
                 RSSHUB_INSTANCES, "/twitter/user/{username}"
             )
         if not self._working_rsshub:
             return []
-        return self._fetch_rss_entries(self._working_rsshub, "/twitter/user/{username}", days_back)
+        return self._fetch_rss_entries(
+            self._working_rsshub, "/twitter/user/{username}", since_ts, RSSHUB_INSTANCES,
+        )
 
     # ──────────────────────────────────────
     # Logique commune RSS
     # ──────────────────────────────────────
 
-    def _fetch_rss_entries(self, base_url: str, path_tpl: str, days_back: int) -> List[Dict]:
-        all_entries = []
-        cutoff = datetime.now() - timedelta(days=days_back)
-
-        for username, display_name in self.accounts:
-            try:
-                path = path_tpl.replace("{username}", username)
-                url = f"{base_url}{path}"
-                resp = requests.get(
-                    url, timeout=6,
-                    headers={"User-Agent": "Mozilla/5.0 (AliDonerBot/1.0)"}
+    def _fetch_rss_entries(self, base_url: str, path_tpl: str, since_ts: float,
+                           instances: List[str] = None) -> List[Dict]:
+        """
+        Tous les comptes en parallèle sur l'instance choisie (concurrence
+        bornée par instance). Les comptes en erreur sont retentés sur les
+        instances suivantes du classement au lieu d'être perdus.
+        """
+        usernames = [username for username, _ in self.accounts]
+        results: Dict[str, List[Dict]] = {}
+
+        fallbacks = [i for i in self._rank_instances(instances or []) if i != base_url]
+        chain = [base_url] + fallbacks[:RSS_FAILOVER_INSTANCES]
+        pending = usernames
+        for inst in chain:
+            if inst != base_url:
+                print(f"    ↪️  {len(pending)} comptes retentés sur {inst}")
+            with ThreadPoolExecutor(max_workers=INSTANCE_CONCURRENCY) as pool:
+                fetched = pool.map(
+                    lambda username: self._fetch_account_rss(inst, path_tpl, username, since_ts),
+                    pending,
                 )
-                if resp.status_code != 200:
+                for username, entries in zip(pending, fetched):
+                    if entries is not None:
+                        results[username] = entries
+            pending = [u for u in pending if u not in results]
+            if not pending:
+                break
+
+        # Fusion dans l'ordre de la config (résultat déterministe)
+        return [entry for username in usernames for entry in results.get(username, [])]
+
+    def _fetch_account_rss(self, base_url: str, path_tpl: str, username: str,
+                           cutoff_ts: float) -> Optional[List[Dict]]:
+        """Tweets d'un compte via une instance ; None si l'instance a échoué"""
+        try:
+            path = path_tpl.replace("{username}", username)
+            url = f"{base_url}{path}"
+            resp = http_client.get(
+                url, timeout=6,
+                headers={
+                    "User-Agent": "Mozilla/5.0 (AliDonerBot/1.0)",
+                    **http_cache.conditional_headers(url, cutoff_ts),
+                },
+                source="twitter",
+            )
+            if resp.status_code == 304:
+                return http_cache.replay(url, cutoff_ts)
+            if resp.status_code != 200:
+                return None
+            if b"<rss" not in resp.content[:500] and b"<feed" not in resp.content[:500]:
+                return None
+
+            # Marqueur "plus récent vu" : compte calme → entrées du dernier run
+            newest = _first_entry_ts(resp.content)
+            with _timelines.lock:
+                marker = _timelines.data.setdefault("rss", {}).get(username.lower())
+            if newest and marker and newest <= marker["newest"] and marker["cutoff"] <= cutoff_ts:
+                account_entries = [dict(e) for e in timestamps.newer_than(marker["entries"], cutoff_ts)]
+                http_cache.store_response(url, resp, account_entries, 0.0, cutoff_ts)
+                return account_entries
+
+            start = time.perf_counter()
+            feed = feed_parser.parse(resp.content, limit=3, cutoff_ts=cutoff_ts)
+            account_entries = []
+
+            for entry in feed.entries[:3]:
+                published_ts = timestamps.entry_ts(entry)
+                if published_ts is not None and published_ts < cutoff_ts:
                     continue
-                if "<rss" not in resp.text[:500] and "<feed" not in resp.text[:500]:
+
+                raw_title = entry.get("title", "")
+                title = self._clean_tweet_text(raw_title)
+                if not title or len(title) < 20:
                     continue
+                if len(title) > 140:
+                    title = title[:137] + "…"
+
+                link = entry.get("link", f"https://x.com/{username}")
+                if "nitter" in link or "xcancel" in link or "rsshub" in link:
+                    link = f"https://x.com/{username}"
+
+                account_entries.append({
+                    "source": f"X: @{username}",
+                    "title": title,
+                    "link": link,
+                    "summary": title,
+                    "published": timestamps.to_iso(published_ts),
+                    "published_ts": published_ts,
+                    "type": "twitter",
+                    "score": 0,
+                })
+
+            http_cache.store_response(
+                url, resp, account_entries, time.perf_counter() - start, cutoff_ts,
+            )
+            if newest:
+                with _timelines.lock:
+                    _timelines.data["rss"][username.lower()] = {
+                        "newest": newest, "cutoff": cutoff_ts, "entries": [dict(e) for e in account_entries],
+                    }
+                    _timelines.mark_dirty()
+            return account_entries
+        except Exception:
+            return None
 
-                feed = feedparser.parse(resp.text)
-
-                for entry in feed.entries[:3]:
-                    published = self._parse_date(entry)
-                    if published and published < cutoff:
-                        continue
-
-                    raw_title = entry.get("title", "")
-                    title = self._clean_tweet_text(raw_title)
-                    if not title or len(title) < 20:
-                        continue
-                    if len(title) > 140:
-                        title = title[:137] + "…"
-
-                    link = entry.get("link", f"https://x.com/{username}")
-                    if "nitter" in link or "xcancel" in link or "rsshub" in link:
-                        link = f"https://x.com/{username}"
-
-                    all_entries.append({
-                        "source": f"X: @{username}",
-                        "title": title,
-                        "link": link,
-                        "summary": title,
-                        "published": published.isoformat() if published else None,
-                        "type": "twitter",
-                        "score": 0,
-                    })
-
-                time.sleep(0.15)
-            except Exception:
-                continue
+    def _find_working_instance(self, instances: list, path_tpl: str) -> Optional[str]:
+        """
+        Instance Nitter/RSSHub à utiliser pour ce run. Si la mieux classée
+        est fiable on la teste seule ; sinon toutes les candidates sont
+        sondées en même temps et la première qui répond correctement gagne.
+        Les instances mortes récemment sont sautées.
+        """
+        candidates = self._rank_instances(instances)
+        if not candidates:
+            return None
+
+        # Des sondes précédentes finissent en arrière-plan et écrivent sous le verrou
+        with _health.lock:
+            best_rate = _health.data.get(candidates[0], {}).get("rate", 0)
+        if best_rate >= INSTANCE_TRUSTED_RATE:
+            if self._probe_instance(candidates[0], path_tpl):
+                print(f"    ✓ Instance active : {candidates[0]}")
+                return candidates[0]
+            candidates = candidates[1:]
+            if not candidates:
+                return None
+
+        pool = ThreadPoolExecutor(max_workers=len(candidates))
+        futures = {pool.submit(self._probe_instance, inst, path_tpl): inst for inst in candidates}
+        winner = None
+        try:
+            for future in as_completed(futures):
+                if future.result():
+                    winner = futures[future]
+                    break
+        finally:
+            # Les sondes en cours finissent en arrière-plan (elles notent la santé)
+            pool.shutdown(wait=False)
 
-        return all_entries
+        if winner:
+            print(f"    ✓ Instance active : {winner}")
+        return winner
 
-    def _find_working_instance(self, instances: list, path_tpl: str) -> Optional[str]:
+    @staticmethod
+    def _rank_instances(instances: list) -> List[str]:
+        """Instances par taux de succès puis latence, sans les mortes récentes"""
+        now = time.time()
+        with _health.lock:
+            ranked = []
+            for position, inst in enumerate(instances):
+                record = _health.data.get(inst)
+                if record is None:
+                    # Jamais testée : après les instances connues fiables
+                    ranked.append((-0.5, INSTANCE_PROBE_TIMEOUT, position, inst))
+                    continue
+                dead = record["rate"] < INSTANCE_DEAD_RATE
+                if dead and now - record.get("last_probe", 0) < INSTANCE_RETRY_AFTER:
+                    continue
+                ranked.append((-record["rate"], record.get("latency") or INSTANCE_PROBE_TIMEOUT, position, inst))
+        if not ranked:
+            # Toutes mortes récemment : on re-sonde tout plutôt que d'abandonner X
+            return list(instances)
+        return [inst for *_, inst in sorted(ranked)]
+
+    @staticmethod
+    def _probe_instance(inst: str, path_tpl: str) -> bool:
         test_user = "sama"
-        for inst in instances:
-            try:
-                path = path_tpl.replace("{username}", test_user)
-                url = f"{inst}{path}"
-                resp = requests.get(
-                    url, timeout=5,
-                    headers={"User-Agent": "Mozilla/5.0 (AliDonerBot/1.0)"}
-                )
-                if resp.status_code == 200 and (
-                    "<item" in resp.text or "<entry" in resp.text
-                ):
-                    print(f"    ✓ Instance active : {inst}")
-                    return inst
-            except Exception:
-                continue
-        return None
+        url = f"{inst}{path_tpl.replace('{username}', test_user)}"
+        start = time.perf_counter()
+        try:
+            resp = http_client.get(
+                url, timeout=INSTANCE_PROBE_TIMEOUT,
+                headers={"User-Agent": "Mozilla/5.0 (AliDonerBot/1.0)"},
+                source="twitter",
+            )
+            ok = resp.status_code == 200 and ("<item" in resp.text or "<entry" in resp.text)
+        except CircuitOpenError:
+            return False  # Pas de requête envoyée : rien à noter
+        except Exception:
+            ok = False
+
+        latency = time.perf_counter() - start
+        with _health.lock:
+            record = _health.data.setdefault(inst, {"rate": float(ok), "latency": None, "tries": 0, "last_ok": None})
+            if record["tries"]:
+                record["rate"] = round((1 - INSTANCE_RATE_ALPHA) * record["rate"] + INSTANCE_RATE_ALPHA * ok, 3)
+            record["tries"] += 1
+            record["last_probe"] = time.time()
+            if ok:
+                previous = record["latency"]
+                record["latency"] = round(latency if previous is None else (previous + latency) / 2, 3)
+                record["last_ok"] = record["last_probe"]
+            _health.mark_dirty()
+        return ok
 
     # ──────────────────────────────────────
     # Utilitaires
@@ -349,19 +642,7 @@ class TwitterFetcher:
         text = re.sub(r'\s+', ' ', text).strip()
         return text
 
-    @staticmethod
-    def _parse_date(entry) -> Optional[datetime]:
-        for field in ['published_parsed', 'updated_parsed']:
-            if hasattr(entry, field) and getattr(entry, field):
-                try:
-                    return datetime.fromtimestamp(time.mktime(getattr(entry, field)))
-                except Exception:
-                    pass
-        for field in ['published', 'updated']:
-            if hasattr(entry, field) and getattr(entry, field):
-                try:
-                    dt = date_parser.parse(getattr(entry, field))
-                    return dt.replace(tzinfo=None) if dt.tzinfo else dt
-                except Exception:
-                    pass
-        return None
+
+@register("twitter", "X / Twitter", cost=len(DEFAULT_ACCOUNTS), cacheable=True)
+async def fetch_twitter(window: Window, accounts: List[tuple] = None) -> List[Dict]:
+    return await in_thread(TwitterFetcher(accounts).fetch_all, window.days_back, since_ts=window.since_ts)
@@ -0,0 +1,106 @@
+"""
+Quota X API, d'après les en-têtes de chaque réponse.
+X renvoie pour chaque endpoint `x-rate-limit-remaining` / `x-rate-limit-reset`
+(fenêtre de 15 min) et, selon le tier, des limites 24h (`x-user-limit-24hour-*`,
+`x-app-limit-24hour-*`). On garde la dernière valeur connue entre les runs
+pour ne jamais envoyer un appel dont on sait qu'il sera refusé.
+"""
+import re
+import time
+from datetime import datetime
+from typing import List, Optional
+
+import requests
+
+from state_store import JsonStore
+
+# Préfixes d'en-têtes lus : fenêtre 15 min + limites 24h (utilisateur / app)
+_WINDOWS = ("x-rate-limit", "x-user-limit-24hour", "x-app-limit-24hour")
+_ID_RE = re.compile(r"(?<!^)/\d+(?=/|$)")  # Ids numériques, pas la version (/2)
+
+
+def endpoint_key(url: str) -> str:
+    """https://api.x.com/2/users/123/tweets → /2/users/:id/tweets (une clé est renvoyée telle quelle)"""
+    path = url.split("x.com", 1)[-1].split("?", 1)[0]
+    return _ID_RE.sub("/:id", path)
+
+
+class XQuota:
+    """
+    Format : {endpoint: {fenêtre: {"remaining": n, "reset": ts}}}
+    Une fenêtre dont le reset est passé ne compte plus (budget plein).
+    """
+
+    def __init__(self, name: str = "x_quota"):
+        self.store = JsonStore(name)
+
+    def update(self, url: str, resp: requests.Response):
+        """Enregistre le budget annoncé par une réponse de l'API"""
+        windows = {}
+        for prefix in _WINDOWS:
+            remaining = resp.headers.get(f"{prefix}-remaining")
+            reset = resp.headers.get(f"{prefix}-reset")
+            if remaining is None or reset is None:
+                continue
+            try:
+                windows[prefix] = {"remaining": int(remaining), "reset": int(reset)}
+            except ValueError:
+                continue
+
+        if resp.status_code == 429 and not windows:
+            # 429 sans en-têtes : on bloque la fenêtre 15 min par prudence
+            windows["x-rate-limit"] = {"remaining": 0, "reset": int(time.time()) + 15 * 60}
+
+        if not windows:
+            return
+        with self.store.lock:
+            self.store.data.setdefault(endpoint_key(url), {}).update(windows)
+            self.store.mark_dirty()
+
+    def remaining(self, url: str) -> Optional[int]:
+        """Appels encore permis sur l'endpoint (None = inconnu, donc pas de limite connue)"""
+        now = time.time()
+        with self.store.lock:
+            windows = self.store.data.get(endpoint_key(url), {})
+            active = [w["remaining"] for w in windows.values() if w["reset"] > now]
+        return min(active) if active else None
+
+    def can_spend(self, url: str) -> bool:
+        remaining = self.remaining(url)
+        return remaining is None or remaining > 0
+
+    def allocate(self, url: str, accounts: List[str], priority: List[str]) -> List[str]:
+        """
+        Comptes à interroger avec le budget restant : prioritaires d'abord,
+        puis les autres dans l'ordre de la config, tronqué au budget.
+        """
+        rank = {name.lower(): i for i, name in enumerate(priority)}
+        ordered = sorted(accounts, key=lambda a: rank.get(a.lower(), len(rank)))
+        remaining = self.remaining(url)
+        return ordered if remaining is None else ordered[:remaining]
+
+    def next_window(self, url: str) -> Optional[datetime]:
+        """Heure de réouverture si l'endpoint est épuisé, sinon None"""
+        now = time.time()
+        with self.store.lock:
+            windows = self.store.data.get(endpoint_key(url), {})
+            blocked = [w["reset"] for w in windows.values() if w["reset"] > now and w["remaining"] <= 0]
+        return datetime.fromtimestamp(max(blocked)) if blocked else None
+
+    def report(self) -> str:
+        now = time.time()
+        parts = []
+        with self.store.lock:
+            for endpoint, windows in sorted(self.store.data.items()):
+                active = [w for w in windows.values() if w["reset"] > now]
+                if active:
+                    tight = min(active, key=lambda w: w["remaining"])
+                    parts.append(
+                        f"{endpoint} {tight['remaining']} restants "
+                        f"(reset {datetime.fromtimestamp(tight['reset']):%H:%M})"
+                    )
+        return "📊 Quota X : " + (" | ".join(parts) if parts else "budget plein")
+
+
+# Instance partagée par les fetchers X
+x_quota = XQuota()
@@ -0,0 +1,69 @@
+"""
+AliDonerBot — État persistant des fetchers
+Petits stores JSON (cache HTTP, index, compteurs...) rangés dans .cache/,
+chargés à la demande et sauvegardés en une fois en fin de collecte.
+En CI, le dossier .cache/ est conservé entre les runs via actions/cache.
+"""
+import os
+import json
+import threading
+from typing import Dict, List
+
+STATE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache")
+
+
+class JsonStore:
+    """
+    Un fichier JSON = un store. Accès thread-safe via `store.lock`,
+    appeler `mark_dirty()` après modification pour qu'il soit sauvegardé.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self.path = os.path.join(STATE_DIR, f"{name}.json")
+        self.lock = threading.RLock()
+        self._data = None
+        self._dirty = False
+        _STORES.append(self)
+
+    @property
+    def data(self) -> Dict:
+        with self.lock:
+            if self._data is None:
+                self._data = self._load()
+            return self._data
+
+    def _load(self) -> Dict:
+        if os.path.exists(self.path):
+            try:
+                with open(self.path, "r") as f:
+                    return json.load(f)
+            except (json.JSONDecodeError, IOError):
+                pass
+        return {}
+
+    def mark_dirty(self):
+        self._dirty = True
+
+    def save(self):
+        with self.lock:
+            if not self._dirty or self._data is None:
+                return
+            os.makedirs(STATE_DIR, exist_ok=True)
+            tmp = f"{self.path}.tmp"
+            with open(tmp, "w") as f:
+                json.dump(self._data, f, separators=(",", ":"))
+            os.replace(tmp, self.path)
+            self._dirty = False
+
+
+_STORES: List[JsonStore] = []
+
+
+def save_all():
+    """Sauvegarde tous les stores modifiés pendant le run"""
+    for store in _STORES:
+        try:
+            store.save()
+        except (IOError, OSError, TypeError, ValueError) as e:
+            print(f"    ⚠️  État '{store.name}' non sauvegardé : {e}")
@@ -15,6 +15,7 @@ import time
 import glob
 import threading
 import requests
+import http_client
 from typing import Set, Dict, Optional
 
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
@@ -197,7 +198,7 @@ def send_message(token: str, chat_id: str, text: str):
         # Split if too long
         chunks = [text[i:i+4096] for i in range(0, len(text), 4096)]
         for chunk in chunks:
-            requests.post(
+            http_client.post(
                 f"{TELEGRAM_API}/bot{token}/sendMessage",
                 json={"chat_id": chat_id, "text": chunk, "disable_web_page_preview": True},
                 timeout=15,
@@ -224,7 +225,7 @@ def poll_commands(token: str, stop_event: threading.Event = None):
             break
 
         try:
-            resp = requests.get(
+            resp = http_client.get(
                 f"{api}/getUpdates",
                 params={"offset": offset, "timeout": 30},
                 timeout=35,
@@ -8,6 +8,7 @@ import re
 from datetime import datetime
 from typing import List, Optional
 from analyzer import AnalyzedItem
+from sources.summaries import full_summary
 
 # Emojis par catégorie
 CATEGORY_EMOJI = {
@@ -139,7 +140,7 @@ class TelegramFormatter:
         if ai_summary:
             lines.append(f"  {ai_summary}")
         else:
-            raw = original.get('summary', '')
+            raw = full_summary(original)
             summary = self._clean_summary(raw, title)
             if summary:
                 lines.append(f"  {summary}")
@@ -5,7 +5,7 @@ Supporte l'envoi à tous les abonnés via subscribers.json
 """
 import os
 import time
-import requests
+import http_client
 from typing import Optional, List, Set
 
 # Limite Telegram pour un message
@@ -43,7 +43,7 @@ class TelegramSender:
                 if i > 0:
                     time.sleep(0.5)
 
-                resp = requests.post(
+                resp = http_client.post(
                     f"{self.api_url}/sendMessage",
                     json={
                         "chat_id": target,
@@ -88,7 +88,7 @@ class TelegramSender:
     def test_connection(self) -> bool:
         """Teste la connexion au bot (synchrone)"""
         try:
-            resp = requests.get(f"{self.api_url}/getMe", timeout=10)
+            resp = http_client.get(f"{self.api_url}/getMe", timeout=10)
             if resp.ok:
                 data = resp.json().get("result", {})
                 print(f"    ✅ Bot connecté: @{data.get('username')} ({data.get('first_name')})")
@@ -103,7 +103,7 @@ class TelegramSender:
     def get_updates(self) -> list:
         """Récupère les derniers messages envoyés au bot"""
         try:
-            resp = requests.get(
+            resp = http_client.get(
                 f"{self.api_url}/getUpdates",
                 params={"timeout": 10},
                 timeout=15,
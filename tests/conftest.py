@@ -0,0 +1,22 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import state_store  # noqa: E402
+from sources.seen_index import seen_index  # noqa: E402
+
+
+@pytest.fixture(autouse=True)
+def isolated_state(tmp_path, monkeypatch):
+    """Stores JSON vides, rangés dans un dossier temporaire (jamais dans .cache/)"""
+    monkeypatch.setattr(state_store, "STATE_DIR", str(tmp_path))
+    for store in state_store._STORES:
+        monkeypatch.setattr(store, "path", str(tmp_path / f"{store.name}.json"))
+        monkeypatch.setattr(store, "_data", None)
+        monkeypatch.setattr(store, "_dirty", False)
+    # Caches en mémoire dérivés des stores
+    monkeypatch.setattr(seen_index, "_link_maps", {})
+    monkeypatch.setattr(seen_index, "_pruned", False)
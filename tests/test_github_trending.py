@@ -0,0 +1,59 @@
+import os
+
+from bs4 import BeautifulSoup
+
+from sources import github_trending
+from sources.github_trending import TOP_N, _article_entry, parse_page
+
+FIXTURE = os.path.join(os.path.dirname(__file__), "fixtures", "github_trending.html")
+# Horodatage du parse : diffère forcément entre deux appels
+VOLATILE = ("published", "published_ts")
+
+
+def _load() -> str:
+    with open(FIXTURE, encoding="utf-8") as f:
+        return f.read()
+
+
+def _reference(html: str, topic: str, since: str):
+    """Chemin d'origine : page complète, find_all('article', class_='Box-row')[:TOP_N]"""
+    soup = BeautifulSoup(html, 'html.parser')
+    articles = soup.find_all('article', class_='Box-row')[:TOP_N]
+    entries = [_article_entry(article, topic, since) for article in articles]
+    return [e for e in entries if e]
+
+
+def _stable(entries):
+    return [{k: v for k, v in e.items() if k not in VOLATILE} for e in entries]
+
+
+def test_parse_page_matches_full_parse():
+    html = _load()
+    for topic, since in (("llm", "daily"), (None, "weekly")):
+        fast = parse_page(html, topic, since)
+        assert _stable(fast) == _stable(_reference(html, topic, since))
+
+
+def test_parse_page_matches_full_parse_with_html_parser(monkeypatch):
+    monkeypatch.setattr(github_trending, "_PARSER", "html.parser")
+    html = _load()
+    assert _stable(parse_page(html, "ai", "daily")) == _stable(_reference(html, "ai", "daily"))
+
+
+def test_class_variants_are_not_counted():
+    html = _load()
+    links = [e['link'] for e in parse_page(html, "llm", "daily")]
+    assert "https://github.com/placeholder/skeleton" not in links
+    assert "https://github.com/not/a-repo" not in links
+    # 10 blocs Box-row dont un sans lien de repo → 9 entrées
+    assert len(links) == TOP_N - 1
+    assert links[0] == "https://github.com/microsoft/autogen"
+
+
+def test_article_start_regex_matches_whole_class_token():
+    starts = github_trending._ARTICLE_START_RE
+    assert starts.search('<article class="Box-row">')
+    assert starts.search("<article class='Box-row Box-row--focus-gray'>")
+    assert starts.search('<article data-x="1" class="d-flex Box-row">')
+    assert not starts.search('<article class="Box-row--focus">')
+    assert not starts.search('<article class="Box-row--placeholder">')
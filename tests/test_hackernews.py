@@ -0,0 +1,70 @@
+import time
+
+import requests
+
+import http_client
+from sources.hackernews import BATCH_MAX_HITS, HackerNewsFetcher
+
+QUERIES = ["LLM", "OpenAI", "Claude AI"]
+
+
+def _response(payload):
+    resp = requests.Response()
+    resp.status_code = 200
+    resp.json = lambda: payload
+    return resp
+
+
+def _fake_algolia(monkeypatch, nb_hits):
+    """Algolia simulé : la page batch annonce `nb_hits` stories"""
+    calls = []
+    now = int(time.time())
+
+    def fake_get(url, params=None, **kwargs):
+        calls.append(params)
+        if 'query' in params:
+            hit = {'objectID': params['query'], 'title': f"{params['query']} news", 'url': '',
+                   'points': 5, 'num_comments': 0, 'created_at_i': now - 60}
+            return _response({'hits': [hit], 'nbHits': 1})
+        hits = [{'objectID': str(i), 'title': 'LLM release', 'url': '', 'points': 1,
+                 'num_comments': 0, 'created_at_i': now - 60} for i in range(min(nb_hits, BATCH_MAX_HITS))]
+        return _response({'hits': hits, 'nbHits': nb_hits})
+
+    monkeypatch.setattr(http_client, "get", fake_get)
+    return calls
+
+
+def _batch_calls(calls):
+    return [c for c in calls if 'query' not in c]
+
+
+def test_batch_fits_one_request(monkeypatch):
+    calls = _fake_algolia(monkeypatch, nb_hits=20)
+    entries = HackerNewsFetcher().fetch_all(QUERIES, 1, min_points=1)
+    assert len(calls) == 1
+    assert entries
+
+
+def test_overflow_goes_per_query_without_repeating_the_batch(monkeypatch):
+    calls = _fake_algolia(monkeypatch, nb_hits=1500)
+
+    HackerNewsFetcher().fetch_all(QUERIES, 1, min_points=1)
+    assert len(_batch_calls(calls)) == 1
+    assert len(calls) == 1 + len(QUERIES)
+
+    # Runs suivants (alertes toutes les 4h) : fenêtre connue trop grande → per-query seulement
+    for _ in range(3):
+        calls.clear()
+        entries = HackerNewsFetcher().fetch_all(QUERIES, 1, min_points=1)
+        assert _batch_calls(calls) == []
+        assert len(calls) == len(QUERIES)
+        assert entries
+
+
+def test_overflow_is_remembered_per_points_floor(monkeypatch):
+    calls = _fake_algolia(monkeypatch, nb_hits=1500)
+    HackerNewsFetcher().fetch_all(QUERIES, 1, min_points=1)
+
+    calls.clear()
+    HackerNewsFetcher().fetch_all(QUERIES, 1, min_points=3)
+    assert len(_batch_calls(calls)) == 1
@@ -0,0 +1,84 @@
+import json
+import time
+from email.utils import formatdate
+
+import requests
+
+import config
+import http_client
+import state_store
+from sources import registry, scheduler
+from sources.registry import Window, in_thread, register
+from sources.rss_fetcher import RSSFetcher
+from sources.seen_index import seen_index
+from sources.summaries import full_summary
+
+FEED_URL = "https://blog.example/feed"
+BODY = "<p>" + "Large language models keep improving. " * 40 + "</p>"
+
+
+def _feed(now: float) -> bytes:
+    items = "".join(
+        f"<item><title>Post {i}</title><link>https://blog.example/{i}</link>"
+        f"<pubDate>{formatdate(now - i * 3600)}</pubDate>"
+        f"<description><![CDATA[{BODY}]]></description></item>"
+        for i in range(3)
+    )
+    return f'<?xml version="1.0"?><rss version="2.0"><channel><title>T</title>{items}</channel></rss>'.encode()
+
+
+def _serve_feed(monkeypatch):
+    now = time.time()
+
+    def fake_get(url, **kwargs):
+        resp = requests.Response()
+        resp.status_code = 200
+        resp.url = url
+        resp.headers['content-type'] = 'application/rss+xml'
+        resp._content = _feed(now)
+        return resp
+
+    monkeypatch.setattr(http_client, "get", fake_get)
+
+
+def _fetch():
+    source = config.Source("Blog", FEED_URL, "rss", "research")
+    return RSSFetcher().fetch_feeds([source], 1, since_ts=time.time() - 86400)[0].entries
+
+
+def test_raw_html_is_stored_once(monkeypatch, tmp_path):
+    _serve_feed(monkeypatch)
+    first = _fetch()
+    second = _fetch()  # Entrées servies par l'index des entrées vues
+    state_store.save_all()
+
+    assert all('summary_html' in e for e in first + second)
+    assert [full_summary(e) for e in first] == [full_summary(e) for e in second]
+    assert 'summary_html' not in (tmp_path / "seen_entries.json").read_text()
+    assert 'summary_html' in (tmp_path / "http_cache.json").read_text()
+    assert seen_index.store.data[FEED_URL]
+
+
+def test_last_results_fallback_restores_raw_html(monkeypatch, tmp_path):
+    _serve_feed(monkeypatch)
+    mode = {"fail": False}
+
+    @register("rss_fallback_test", "RSS test", cacheable=True)
+    async def fetch(window):
+        if mode["fail"]:
+            raise RuntimeError("down")
+        return await in_thread(_fetch)
+
+    try:
+        window = Window(1, time.time() - 86400)
+        fresh = scheduler.collect(["rss_fallback_test"], window, parallel=False)
+        assert fresh
+        stored = json.loads((tmp_path / "source_results.json").read_text())
+        assert 'summary_html' not in json.dumps(stored)
+
+        mode["fail"] = True
+        replayed = scheduler.collect(["rss_fallback_test"], window, parallel=False)
+        assert [e['link'] for e in replayed] == [e['link'] for e in fresh]
+        assert all(e.get('summary_html') for e in replayed)
+    finally:
+        registry.SOURCE_TYPES.pop("rss_fallback_test", None)
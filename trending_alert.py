@@ -13,8 +13,11 @@ from datetime import datetime
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
 import config
-from sources.rss_fetcher import RSSFetcher
-from sources.hackernews import HackerNewsFetcher
+import http_client
+from sources import scheduler, timestamps
+from sources.http_cache import http_cache
+from sources.registry import Window
+from sources.summaries import full_summary
 from analyzer import NewsAnalyzer
 from telegram_sender import TelegramSender, get_sender_from_env
 from subscribers import get_all_subscribers, add_subscriber
@@ -53,25 +56,20 @@ def main():
     print(f"   {datetime.now().strftime('%Y-%m-%d %H:%M')}")
     print()
 
-    # Collect (rapide : RSS + HN seulement)
-    rss = RSSFetcher()
-    hn = HackerNewsFetcher()
-    items = []
-
-    print("   📡 RSS (labs uniquement)...")
+    # Collect (rapide : RSS des labs + HN seulement)
     lab_sources = [s for s in config.RSS_SOURCES if s.category == "labs"]
-    for source in lab_sources:
-        fetched = rss.fetch_feed(source.name, source.url, 1)
-        for item in fetched:
-            item['source_category'] = source.category
-            item['priority_boost'] = source.priority_boost
-        items.extend(fetched)
-
-    print("   📡 Hacker News...")
-    hn_items = hn.fetch_all(config.HACKERNEWS_QUERIES[:3], 1)
-    items.extend(hn_items)
+    items = scheduler.collect(
+        ["rss", "hackernews"], Window(1, timestamps.window_start(1)),
+        params={
+            "rss": {"sources": lab_sources, "adaptive": config.ADAPTIVE_POLLING_ALERTS},
+            "hackernews": {"queries": config.HACKERNEWS_QUERIES[:3], "min_points": config.HN_ALERT_MIN_POINTS},
+        },
+        parallel=config.PARALLEL_COLLECTION,
+    )
 
     print(f"   📊 {len(items)} items collectés")
+    print(f"   {http_cache.report()}")
+    print(f"   {http_client.breaker_report()}")
 
     if not items:
         print("   Rien de nouveau.")
@@ -139,7 +137,7 @@ def main():
     for i, item in enumerate(new_alerts[:3]):
         original = item.original
         title = original.get("ai_title", "") or original.get("title", "")
-        summary = original.get("ai_summary", "") or original.get("summary", "")[:150]
+        summary = original.get("ai_summary", "") or full_summary(original)[:150]
         link = original.get("link", "")
 
         lines.append(f"{i+1}. {title}")
@@ -167,6 +165,7 @@ def main():
             ok = sender.send_to_all(message, subs)
             print(f"   ✅ Alerte envoyée à {ok}/{len(subs)} abonné(s)")
 
+    print(f"   {http_client.report()}")
     save_alerts(alerts)
 
 